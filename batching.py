@@ -0,0 +1,70 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+class MicroBatcher:
+    # Lookups submitted within `window` seconds of the first one in a batch are
+    # sent together. A batch of one goes through `resolve_one` when given, so a
+    # lone copy does not pay for the larger batch prompt.
+    def __init__(self, resolve_batch, resolve_one=None, window=0.01, max_batch=8, workers=4):
+        self.resolve_batch = resolve_batch
+        self.resolve_one = resolve_one
+        self.window = window
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="lookup-batch")
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.batched_phrases = 0
+        self._thread = threading.Thread(target=self._collect, name="lookup-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, phrase):
+        future = Future()
+        self._queue.put((phrase, future))
+        return future
+
+    def lookup(self, phrase, timeout=None):
+        return self.submit(phrase).result(timeout)
+
+    def _collect(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._executor.submit(self._dispatch, batch)
+
+    def _dispatch(self, batch):
+        waiters = {}
+        for phrase, future in batch:
+            waiters.setdefault(phrase, []).append(future)
+        phrases = list(waiters)
+        with self._stats_lock:
+            self.batches += 1
+            self.batched_phrases += len(phrases)
+
+        try:
+            if len(phrases) == 1 and self.resolve_one:
+                results = {phrases[0]: self.resolve_one(phrases[0])}
+            else:
+                logging.debug(f"Resolving batch of {len(phrases)} phrases")
+                results = self.resolve_batch(phrases)
+        except Exception as e:
+            for futures in waiters.values():
+                for future in futures:
+                    future.set_exception(e)
+            return
+
+        for phrase, futures in waiters.items():
+            result = results.get(phrase, (f"⚠️ Error: No result for \"{phrase}\"", ""))
+            for future in futures:
+                future.set_result(result)
@@ -0,0 +1,79 @@
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bulk_lookup import BulkLookup
+from gemini_client import GeminiClient
+from lookup_cache import LookupCache
+from lookup_core import LookupService
+from mock_gemini import MockGeminiServer
+from rate_limiter import RateLimiter
+
+def word_list(size, seed=1):
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(5, 11))))
+    return sorted(words)
+
+def run(server, words, output, cache_path, workers, batch_size, rpm):
+    client = GeminiClient(api_key="benchmark", base_url=server.base_url, pool_size=max(workers, 4),
+                          limiter=RateLimiter(requests_per_minute=rpm, burst=workers, daily_limit=0, max_wait=3600))
+    cache = LookupCache(cache_path)
+    service = LookupService(client, cache=cache, streaming=False)
+    bulk = BulkLookup(service, output, workers=workers, batch_size=batch_size, limiter=client.limiter,
+                      report_interval=3600, report=lambda line: None)
+    requests_before = server.requests
+    start = time.perf_counter()
+    counts = bulk.run(words)
+    elapsed = time.perf_counter() - start
+    cache.close()
+    client.close()
+    return counts, elapsed, server.requests - requests_before
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless bulk lookups: throughput by concurrency, and resume")
+    parser.add_argument("--words", type=int, default=400)
+    parser.add_argument("--latency", type=float, default=0.3, help="mock Gemini latency (s)")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--rpm", type=int, default=6000, help="rate limit, requests per minute")
+    args = parser.parse_args()
+
+    words = word_list(args.words)
+    server = MockGeminiServer(latency=args.latency, jitter=args.latency / 4, seed=1)
+    server.start()
+    tmp_dir = tempfile.TemporaryDirectory()
+
+    print(f"{args.words} words, batches of {args.batch_size}, mock latency {args.latency * 1000:.0f} ms")
+    for workers in (1, 4, 8):
+        output = os.path.join(tmp_dir.name, f"out_{workers}.jsonl")
+        counts, elapsed, requests = run(server, words, output, os.path.join(tmp_dir.name, f"c_{workers}.db"),
+                                        workers, args.batch_size, args.rpm)
+        print(f"workers {workers}: {elapsed:6.2f}s  {counts['resolved'] / elapsed:7.1f} words/s  "
+              f"gemini requests {requests}  errors {counts['errors']}")
+
+    # Stop after 60% of the list, as if the run had been killed, then resume
+    # with the same output and a cold cache: only the rest is requested.
+    output = os.path.join(tmp_dir.name, "resume.jsonl")
+    cut = int(len(words) * 0.6)
+    first, _, first_requests = run(server, itertools.islice(words, cut), output,
+                                   os.path.join(tmp_dir.name, "r1.db"), 4, args.batch_size, args.rpm)
+    second, _, second_requests = run(server, words, output, os.path.join(tmp_dir.name, "r2.db"),
+                                     4, args.batch_size, args.rpm)
+    with open(output, "r", encoding="utf-8") as f:
+        phrases = [json.loads(line)["phrase"] for line in f]
+    print(f"resume: first run {first['resolved']} words / {first_requests} requests, "
+          f"second run skipped {second['resumed']} and did {second['resolved']} / {second_requests} requests, "
+          f"output has {len(phrases)} lines, {len(set(phrases))} distinct")
+    server.stop()
+    tmp_dir.cleanup()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import argparse
+import json
+import os
+import random
+import sqlite3
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache_pack import CachePack, build_pack, merge_sources, read_trace, replay_hit_ratio
+from lookup_cache import LookupCache
+from lookup_core import is_valid_phrase
+
+LEXICON = ("a an the of to in that which something someone state quality act person place without showing "
+           "having being done feeling great small lasting short time way manner kind able make cause "
+           "especially often used describe condition very not strongly clearly formal informal").split()
+
+def vocabulary(size, seed=1):
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 11))))
+    return sorted(words)
+
+def answer(word):
+    rng = random.Random(word)
+    meaning = " ".join(rng.choice(LEXICON) for _ in range(rng.randint(10, 22))).capitalize() + "."
+    synonyms = ", ".join("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10)))
+                         for _ in range(3))
+    return meaning, synonyms
+
+def session(words, weights, lookups, rng):
+    return rng.choices(words, weights=weights, k=lookups)
+
+def machine_cache(path, lookups):
+    LookupCache(path).close()
+    now = time.time()
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT OR REPLACE INTO lookups (phrase, meaning, synonyms, created, last_used) VALUES (?, ?, ?, ?, ?)",
+        [(word,) + answer(word) + (now, now) for word in set(lookups)]
+    )
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Cache packs: size, lookup cost and hit ratio on a fresh machine")
+    parser.add_argument("--machines", type=int, default=20)
+    parser.add_argument("--vocabulary", type=int, default=20000)
+    parser.add_argument("--lookups", type=int, default=1500, help="lookups per machine")
+    parser.add_argument("--trace", help="also replay a copy trace (JSONL with a \"text\" field)")
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    words = vocabulary(args.vocabulary)
+    weights = [1.0 / (rank + 1) for rank in range(len(words))]
+    tmp_dir = tempfile.TemporaryDirectory()
+
+    db_paths = []
+    for machine in range(args.machines):
+        path = os.path.join(tmp_dir.name, f"machine_{machine}.db")
+        machine_cache(path, session(words, weights, args.lookups, rng))
+        db_paths.append(path)
+    db_bytes = sum(os.path.getsize(path) for path in db_paths)
+    print(f"{args.machines} machine caches, {db_bytes / 1024:.0f} KiB of SQLite in total")
+
+    fresh = session(words, weights, args.lookups, rng)
+    trace = list(read_trace(args.trace)) if args.trace else None
+    cold = replay_hit_ratio(fresh, [], is_valid_phrase)
+    print(f"fresh machine, no pack: hit ratio {cold['hit_ratio']:.3f} ({cold['remote']} of {cold['lookups']} remote)")
+
+    for min_sources in (1, 2, 3):
+        path = os.path.join(tmp_dir.name, f"pack_{min_sources}.wlpk")
+        start = time.perf_counter()
+        count = build_pack(merge_sources(db_paths, min_sources=min_sources), path, sources=len(db_paths))
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        pack = CachePack(path)
+        opened = time.perf_counter() - start
+        sample = [rng.choice(words) for _ in range(20000)]
+        start = time.perf_counter()
+        for word in sample:
+            pack.get(word)
+        per_lookup = (time.perf_counter() - start) / len(sample)
+
+        warm = replay_hit_ratio(fresh, [("pack", pack.get)], is_valid_phrase)
+        size = os.path.getsize(path)
+        print(f"min sources {min_sources}: {count} entries, {size / 1024:.0f} KiB ({size / max(count, 1):.0f} B/entry), "
+              f"build {build:.2f} s, open {opened * 1000:.2f} ms, lookup {per_lookup * 1e6:.1f} us, "
+              f"hit ratio {warm['hit_ratio']:.3f} ({warm['pack']} from pack, {warm['remote']} remote)")
+        if trace:
+            print("  trace: " + json.dumps(replay_hit_ratio(trace, [("pack", pack.get)], is_valid_phrase)))
+        pack.close()
+    tmp_dir.cleanup()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clipboard_watch import FakeClipboardSource, PollingClipboardSource, SequenceClipboardSource
+
+class CountingClipboard:
+    def __init__(self, fake):
+        self.fake = fake
+        self.reads = 0
+
+    def paste(self):
+        self.reads += 1
+        return self.fake.paste()
+
+class EventSource:
+    def __init__(self, fake, counter):
+        self.fake = fake
+        self.counter = counter
+
+    def wait_for_change(self, timeout=None):
+        return self.fake.wait_for_change(timeout)
+
+    def read(self):
+        return self.counter.paste()
+
+    def close(self):
+        pass
+
+def measure(make_source, copies, gap):
+    fake = FakeClipboardSource()
+    counter = CountingClipboard(fake)
+    source = make_source(fake, counter)
+    copied_at = {}
+    latencies = []
+    done = threading.Event()
+
+    def consumer():
+        while len(latencies) < copies:
+            if not source.wait_for_change(timeout=1):
+                continue
+            text = source.read()
+            if text in copied_at:
+                latencies.append(time.perf_counter() - copied_at.pop(text))
+        done.set()
+
+    threading.Thread(target=consumer, daemon=True).start()
+    start = time.perf_counter()
+    for i in range(copies):
+        time.sleep(random.uniform(gap / 2, gap * 1.5))
+        text = f"word{i}"
+        copied_at[text] = time.perf_counter()
+        fake.copy(text)
+    done.wait(copies * gap * 4 + 5)
+    elapsed = time.perf_counter() - start
+    source.close()
+
+    latencies.sort()
+    return {
+        "detected": len(latencies),
+        "mean_ms": statistics.mean(latencies) * 1000 if latencies else None,
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000 if latencies else None,
+        "clipboard_reads_per_s": counter.reads / elapsed
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Copy-to-detect latency of the clipboard backends")
+    parser.add_argument("--copies", type=int, default=30)
+    parser.add_argument("--gap", type=float, default=0.5, help="average seconds between copies")
+    args = parser.parse_args()
+
+    backends = {
+        "polling (0.3s)": lambda fake, counter: PollingClipboardSource(interval=0.3, paste=counter.paste),
+        "sequence (20ms)": lambda fake, counter: SequenceClipboardSource(
+            interval=0.02, get_sequence=fake.sequence_number, paste=counter.paste),
+        "event": lambda fake, counter: EventSource(fake, counter)
+    }
+    for name, make_source in backends.items():
+        result = measure(make_source, args.copies, args.gap)
+        print(f"{name:16} detected={result['detected']:3d} mean={result['mean_ms']:7.2f} ms "
+              f"p95={result['p95_ms']:7.2f} ms reads/s={result['clipboard_reads_per_s']:6.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import argparse
+import gc
+import os
+import random
+import string
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compact_store import CompactStore
+
+def synthetic_entries(count, vocab_size=5000, seed=1):
+    # Meanings are unique sentences; synonyms come from a shared vocabulary, as
+    # they do in real results.
+    rng = random.Random(seed)
+    vocab = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10)))
+             for _ in range(vocab_size)]
+    words = set()
+    while len(words) < count:
+        words.add("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 12))))
+    for word in words:
+        meaning = " ".join(rng.choice(vocab) for _ in range(rng.randint(6, 14)))
+        yield word, f"{meaning} ({word})", ", ".join(rng.sample(vocab, 3))
+
+def decoded(entries):
+    # Entries are held as bytes so that each store pays for its own strings.
+    for phrase, meaning, synonyms in entries:
+        yield phrase.decode("utf-8"), meaning.decode("utf-8"), synonyms.decode("utf-8")
+
+def build_dict(entries):
+    return {phrase: (meaning, synonyms) for phrase, meaning, synonyms in decoded(entries)}
+
+def build_compact(entries):
+    return CompactStore(len(entries)).update(decoded(entries))
+
+def measure(build, entries):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    store = build(entries)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return store, size, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory and lookup time of CompactStore against a plain dict")
+    parser.add_argument("--entries", type=int, default=200000)
+    parser.add_argument("--lookups", type=int, default=200000)
+    args = parser.parse_args()
+
+    entries = [tuple(field.encode("utf-8") for field in entry) for entry in synthetic_entries(args.entries)]
+    rng = random.Random(2)
+    hits = [rng.choice(entries)[0].decode("utf-8") for _ in range(args.lookups)]
+    misses = [word + "zz" for word in hits[:args.lookups // 4]]
+
+    for name, build in (("dict", build_dict), ("compact", build_compact)):
+        store, size, build_time = measure(build, entries)
+        print(f"{name:8} build {build_time:6.2f} s  {size / 1024 / 1024:7.1f} MiB  "
+              f"{size / len(entries):6.1f} bytes/entry")
+        for kind, sample in (("hit", hits), ("miss", misses)):
+            get = store.get
+            start = time.perf_counter()
+            for phrase in sample:
+                get(phrase)
+            elapsed = time.perf_counter() - start
+            print(f"{'':8} {kind:5} {elapsed / len(sample) * 1e6:6.2f} us/lookup")
+        del store
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gemini_client import GeminiClient
+from lookup_cache import LookupCache, is_error_result
+from lookup_core import LookupService
+from lookup_daemon import LookupClient, LookupDaemon, parse_address
+from mock_gemini import MockGeminiServer
+from rate_limiter import RateLimiter
+
+def vocabulary(size, seed=1):
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(letters) for _ in range(rng.randint(4, 10))))
+    return sorted(words)
+
+def client_session(args):
+    # One simulated user session: its own process and connection, copying
+    # words with a Zipf-like preference for the common ones.
+    address, words, lookups, seed = args
+    rng = random.Random(seed)
+    host, port = parse_address(address)
+    client = LookupClient(host, port)
+    weights = [1.0 / (rank + 1) for rank in range(len(words))]
+    latencies = []
+    errors = 0
+    for word in rng.choices(words, weights=weights, k=lookups):
+        start = time.perf_counter()
+        meaning, _ = client.lookup(word)
+        latencies.append(time.perf_counter() - start)
+        if is_error_result(meaning):
+            errors += 1
+    client.close()
+    return latencies, errors
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of the shared lookup daemon under many client processes")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--lookups", type=int, default=40, help="lookups per client")
+    parser.add_argument("--vocabulary", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.15, help="mock Gemini latency (s)")
+    parser.add_argument("--rpm", type=int, default=6000, help="daemon rate limit, requests per minute")
+    parser.add_argument("--daemon", help="load an already running daemon at host:port instead")
+    args = parser.parse_args()
+
+    server = daemon = tmp_dir = None
+    address = args.daemon
+    if not address:
+        server = MockGeminiServer(latency=args.latency, jitter=args.latency / 4, seed=1)
+        client = GeminiClient(api_key="benchmark", base_url=server.start(), pool_size=16,
+                              limiter=RateLimiter(requests_per_minute=args.rpm, burst=20, daily_limit=0))
+        tmp_dir = tempfile.TemporaryDirectory()
+        # Set up as --daemon does: LookupDaemon turns streaming off.
+        service = LookupService(client, cache=LookupCache(os.path.join(tmp_dir.name, "daemon_cache.db")))
+        daemon = LookupDaemon(service, port=0)
+        address = daemon.start()
+
+    words = vocabulary(args.vocabulary)
+    jobs = [(address, words, args.lookups, seed) for seed in range(args.clients)]
+    start = time.perf_counter()
+    with multiprocessing.Pool(args.clients) as pool:
+        results = pool.map(client_session, jobs)
+    wall = time.perf_counter() - start
+
+    latencies = sorted(latency for session, _ in results for latency in session)
+    report = {
+        "clients": args.clients,
+        "lookups": len(latencies),
+        "errors": sum(errors for _, errors in results),
+        "wall_s": round(wall, 2),
+        "throughput_per_s": round(len(latencies) / wall, 1),
+        "latency_ms": {name: round(percentile(latencies, fraction) * 1000, 2)
+                       for name, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))}
+    }
+    if server:
+        report["gemini_calls"] = server.requests
+        report["daemon"] = daemon.stats()
+        daemon.stop()
+        server.stop()
+        tmp_dir.cleanup()
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
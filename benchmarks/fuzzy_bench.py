@@ -0,0 +1,118 @@
+import argparse
+import os
+import random
+import resource
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fuzzy_match import WordMatcher
+from local_dictionary import LocalDictionary
+from paragraph import load_frequency_table
+
+DEFAULT_TABLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "word_frequency.txt")
+
+# Real words that must not be served the answer of a similar known word, and
+# inflections and typos of known words that must still be matched.
+WRONG_MATCHES = [("better", "bet"), ("corner", "corn"), ("number", "numb"), ("hammer", "ham"),
+                 ("early", "ear"), ("only", "on"), ("news", "new"), ("flower", "flow"),
+                 ("wander", "wand"), ("butter", "but"), ("compliment", "complement"), ("staring", "star"),
+                 ("united", "unit"), ("averse", "adverse"), ("discreet", "discrete"), ("dessert", "desert"),
+                 ("statute", "statue"), ("proscribe", "prescribe"), ("stationery", "stationary"),
+                 ("starring", "star"), ("bathed", "bath"), ("planed", "plan")]
+RIGHT_MATCHES = [("obfuscated", "obfuscate"), ("serendipities", "serendipity"), ("quibbling", "quibble"),
+                 ("cajoled", "cajole"), ("ephemerl", "ephemeral"), ("wistfull", "wistful")]
+
+def synthetic_words(count, seed=1):
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < count:
+        words.add("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 12))))
+    return sorted(words)
+
+def typo(word, edits, rng):
+    for _ in range(edits):
+        i = rng.randrange(len(word))
+        kind = rng.choice(("delete", "insert", "replace", "swap"))
+        if kind == "delete" and len(word) > 2:
+            word = word[:i] + word[i + 1:]
+        elif kind == "insert":
+            word = word[:i] + rng.choice(string.ascii_lowercase) + word[i:]
+        elif kind == "swap" and i < len(word) - 1:
+            word = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+        else:
+            word = word[:i] + rng.choice(string.ascii_lowercase) + word[i + 1:]
+    return word
+
+def check_matches(table):
+    # The stand-in dictionary lists both words of every wrong pair and none
+    # of the right ones. Without any word list nothing is matched.
+    failures = []
+    common = frozenset(load_frequency_table(table))
+    dictionary = frozenset(word for pair in WRONG_MATCHES for word in pair)
+    for lexicon in ((), (dictionary, common)):
+        matcher = WordMatcher(lexicon=lexicon)
+        matcher.update([known for _, known in WRONG_MATCHES + RIGHT_MATCHES])
+        for word, known in WRONG_MATCHES:
+            if matcher.match(word) is not None:
+                failures.append(f"{word} matched {matcher.match(word)}")
+        for word, known in RIGHT_MATCHES:
+            expected = known if lexicon else None
+            if matcher.match(word) != expected:
+                failures.append(f"{word} matched {matcher.match(word)}, expected {expected}")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Candidate lookup time of the fuzzy word matcher")
+    parser.add_argument("--words", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--prefix-length", type=int, default=7)
+    parser.add_argument("--index", help="use the headwords of an existing dictionary index")
+    parser.add_argument("--table", default=DEFAULT_TABLE, help="word frequency table for the match check")
+    args = parser.parse_args()
+
+    failures = check_matches(args.table)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"match check: {len(WRONG_MATCHES)} real words left alone, {len(RIGHT_MATCHES)} variants matched")
+
+    if args.index:
+        words = [word for word in LocalDictionary(args.index).headwords() if word.isalpha()]
+    else:
+        words = synthetic_words(args.words)
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    matcher = WordMatcher(prefix_length=args.prefix_length,
+                          lexicon=[frozenset(load_frequency_table(args.table))]).update(words)
+    build = time.perf_counter() - start
+    rss_growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+    print(f"index: {len(matcher)} words in {build:.2f} s, deletion index "
+          f"{matcher.memory_usage() / 1024 / 1024:.1f} MiB, peak RSS growth {rss_growth / 1024:.1f} MiB")
+
+    rng = random.Random(2)
+    sample = [rng.choice(words) for _ in range(args.queries)]
+    long_sample = [word for word in sample if len(word) >= 8]
+    queries = (
+        ("exact", sample),
+        ("inflected", [word + rng.choice(("s", "ed", "ing")) for word in sample]),
+        ("1 typo", [typo(word, 1, rng) for word in sample if len(word) >= matcher.min_length]),
+        ("2 typos", [typo(word, 2, rng) for word in long_sample]),
+        ("unknown", ["".join(rng.choice(string.ascii_lowercase) for _ in range(10)) for _ in sample])
+    )
+    for name, batch in queries:
+        matched = 0
+        start = time.perf_counter()
+        for word in batch:
+            if matcher.match(word):
+                matched += 1
+        elapsed = time.perf_counter() - start
+        print(f"{name:10} {elapsed / len(batch) * 1e6:8.1f} us/match  "
+              f"{matched / len(batch) * 100:5.1f}% matched  ({len(batch)} queries)")
+
+if __name__ == "__main__":
+    main()
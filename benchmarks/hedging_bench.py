@@ -0,0 +1,157 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gemini_client import GeminiClient
+from hedging import Backend, HedgedClient
+from lookup_cache import is_error_result
+from lookup_core import get_meaning_and_synonyms_from_gemini, get_meaning_and_synonyms_from_gemini_stream
+from mock_gemini import MockGeminiServer
+from rate_limiter import PRIORITY_PREFETCH, RateLimiter
+
+class RecordingLimiter(RateLimiter):
+    def __init__(self):
+        super().__init__(requests_per_minute=60000, burst=1000, daily_limit=0)
+        self.priorities = []
+
+    def acquire(self, priority=None, timeout=None):
+        self.priorities.append(self.current_priority() if priority is None else priority)
+        super().acquire(priority, timeout)
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def run(client, lookups, concurrency, streaming):
+    # Latency of word0..word{lookups - 1}, in that order, and the error count.
+    def one(i):
+        start = time.perf_counter()
+        if streaming:
+            first = []
+            meaning, _ = get_meaning_and_synonyms_from_gemini_stream(
+                client, f"word{i}", lambda *_: first or first.append(time.perf_counter() - start))
+            return (first[0] if first else time.perf_counter() - start), is_error_result(meaning)
+        meaning, _ = get_meaning_and_synonyms_from_gemini(client, f"word{i}")
+        return time.perf_counter() - start, is_error_result(meaning)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(one, range(lookups)))
+    return [elapsed for elapsed, _ in results], sum(1 for _, error in results if error)
+
+def within_budget(client):
+    return client.hedges <= client.hedge_burst + client.max_hedge_ratio * client.requests
+
+def check(lookups=20):
+    # A primary far slower than hedge_after is hedged, the alternate wins
+    # those races, hedges stay within the budget and keep the caller's
+    # limiter priority. 5xx fails over to the alternate, 4xx doesn't.
+    failures = []
+    slow = MockGeminiServer(latency=0.3, ttft=0.3, token_delay=0.0)
+    fast = MockGeminiServer(latency=0.03, ttft=0.03, token_delay=0.0)
+    broken = MockGeminiServer(latency=0.0, error_rate=1.0, error_status=503)
+    for server in (slow, fast, broken):
+        server.start()
+
+    def hedged(primary, **options):
+        return HedgedClient([Backend("primary", GeminiClient(api_key="check", base_url=primary.base_url, retries=0)),
+                             Backend("alternate", GeminiClient(api_key="check", base_url=fast.base_url, retries=0))],
+                            **options)
+
+    client = hedged(slow, hedge_after=0.1, max_hedge_ratio=0.1, hedge_burst=2)
+    limiter = RecordingLimiter()
+    client.limiter = limiter
+    with limiter.priority(PRIORITY_PREFETCH):
+        results = [get_meaning_and_synonyms_from_gemini(client, f"word{i}") for i in range(lookups)]
+    alternate_wins = client.backends[1].wins
+    if any(is_error_result(meaning) for meaning, _ in results):
+        failures.append("slow primary: lookups failed")
+    if not client.hedges or alternate_wins != client.hedges:
+        failures.append(f"slow primary: {client.hedges} hedges, alternate won {alternate_wins}")
+    if not within_budget(client):
+        failures.append(f"slow primary: {client.hedges} hedges in {client.requests} requests is over budget")
+    if set(limiter.priorities) != {PRIORITY_PREFETCH}:
+        failures.append(f"hedged requests reached the limiter with priorities {sorted(set(limiter.priorities))}")
+    client.close()
+
+    for status, fails_over in ((503, True), (400, False)):
+        broken.error_status = status
+        client = hedged(broken)
+        before = fast.requests
+        meaning, _ = get_meaning_and_synonyms_from_gemini(client, "word")
+        if fails_over == is_error_result(meaning) or (fast.requests > before) != fails_over:
+            failures.append(f"HTTP {status}: expected {'a' if fails_over else 'no'} failover, got {meaning!r}")
+        client.close()
+    for server in (slow, fast, broken):
+        server.stop()
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Hedged requests across two mock Gemini backends")
+    parser.add_argument("--lookups", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--budget", type=float, default=0.15, help="max share of hedged requests")
+    args = parser.parse_args()
+
+    failures = check()
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("hedging check: slow primary hedged within budget, priority kept, failover on 5xx only")
+
+    # Every 20th word always hits the primary's 800 ms tail, so the check
+    # looks at the same requests hedged and unhedged.
+    tail = [i for i in range(args.lookups) if i % 20 == 10]
+    scenarios = [
+        ("primary with a slow tail", dict(latency=0.08, jitter=0.02, tail_latency=0.8,
+                                          tail_phrases=[f"word{i}" for i in tail])),
+        ("primary slow across the board", dict(latency=0.3, jitter=0.05)),
+    ]
+    alternate = MockGeminiServer(latency=0.12, jitter=0.02, ttft=0.12, token_delay=0.0, seed=2)
+    alternate.start()
+    print(f"alternate: 120-140 ms; {args.lookups} lookups, {args.concurrency} at a time, "
+          f"hedge budget {args.budget:.0%}")
+    print(f"{'':46} {'p50':>7} {'p90':>7} {'p99':>7} {'max':>7} {'tail max':>9} {'requests':>9} {'errors':>7}")
+    for name, profile in scenarios:
+        primary = MockGeminiServer(ttft=profile["latency"], token_delay=0.0, seed=1, **profile)
+        primary.start()
+        print(name)
+        for streaming in (False, True):
+            kind = "first paint" if streaming else "full"
+            single = GeminiClient(api_key="benchmark", base_url=primary.base_url, pool_size=16)
+            hedged = HedgedClient([
+                Backend("primary", GeminiClient(api_key="benchmark", base_url=primary.base_url, pool_size=16)),
+                Backend("alternate", GeminiClient(api_key="benchmark", base_url=alternate.base_url, pool_size=16)),
+            ], max_hedge_ratio=args.budget)
+            for label, client in ((f"primary only, {kind}", single), (f"hedged, {kind}", hedged)):
+                # Until the primary has min_samples latencies, hedges wait
+                # for the fixed hedge_after instead of its median.
+                run(client, 40, args.concurrency, streaming)
+                requests_before = primary.requests + alternate.requests
+                samples, errors = run(client, args.lookups, args.concurrency, streaming)
+                requests = primary.requests + alternate.requests - requests_before
+                tail_max = max((samples[i] for i in tail if "tail_phrases" in profile), default=0.0)
+                print(f"  {label:44} {percentile(samples, 0.5) * 1000:5.0f}ms {percentile(samples, 0.9) * 1000:5.0f}ms "
+                      f"{percentile(samples, 0.99) * 1000:5.0f}ms {max(samples) * 1000:5.0f}ms "
+                      f"{f'{tail_max * 1000:.0f}ms' if tail_max else '-':>9} {requests / args.lookups:8.2f}x {errors:7}")
+                client.close()
+                if client is hedged and not within_budget(hedged):
+                    failures.append(f"{name}, {kind}: {hedged.hedges} hedges in {hedged.requests} requests")
+                # Each tail request is hedged, and answered by the alternate
+                # well before the primary's 800 ms.
+                if client is hedged and "tail_phrases" in profile and tail_max >= profile["tail_latency"] * 0.75:
+                    failures.append(f"{name}, {kind}: slowest tail request took {tail_max * 1000:.0f} ms")
+            print(f"    {hedged.stats()}")
+        primary.stop()
+    alternate.stop()
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import argparse
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from local_dictionary import LocalDictionary, build_index
+
+def synthetic_entries(count, seed=1):
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < count:
+        words.add("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 12))))
+    for word in words:
+        yield word, f"a made-up meaning for {word}", "alpha, beta, gamma"
+
+def main():
+    parser = argparse.ArgumentParser(description="Lookups per second against a local dictionary index")
+    parser.add_argument("--entries", type=int, default=200000)
+    parser.add_argument("--lookups", type=int, default=200000)
+    parser.add_argument("--index", help="benchmark an existing index instead of a synthetic one")
+    args = parser.parse_args()
+
+    tmp_dir = None
+    path = args.index
+    if not path:
+        tmp_dir = tempfile.TemporaryDirectory()
+        path = os.path.join(tmp_dir.name, "bench.wldx")
+        start = time.perf_counter()
+        build_index(synthetic_entries(args.entries), path)
+        print(f"build: {args.entries} entries in {time.perf_counter() - start:.2f} s, "
+              f"{os.path.getsize(path) / 1024 / 1024:.1f} MiB")
+
+    start = time.perf_counter()
+    dictionary = LocalDictionary(path)
+    print(f"open: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    words = list(dictionary.headwords())
+    rng = random.Random(2)
+    hits = [rng.choice(words) for _ in range(args.lookups)]
+    misses = [w + "zz" for w in hits[:args.lookups // 4]]
+
+    for name, sample in (("hit", hits), ("miss", misses)):
+        start = time.perf_counter()
+        for word in sample:
+            dictionary.get(word)
+        elapsed = time.perf_counter() - start
+        print(f"{name:5}: {len(sample) / elapsed:12,.0f} lookups/s  "
+              f"{elapsed / len(sample) * 1e6:6.2f} us/lookup")
+
+    dictionary.close()
+    if tmp_dir:
+        tmp_dir.cleanup()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import argparse
+import logging
+import os
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_pipeline import start_log_pipeline
+
+class LegacySensitiveFormatter(logging.Formatter):
+    # The synchronous formatter main.py used before log_pipeline, for comparison.
+    sensitive_patterns = [r'GEMINI_API_KEY=[^\s]*', r'api_key=[^\s]*', r'key=[^\s]*']
+
+    def format(self, record):
+        message = super().format(record)
+        for pattern in self.sensitive_patterns:
+            message = re.sub(pattern, '[REDACTED]', message)
+        return message
+
+def configure_legacy(log_file):
+    formatter = LegacySensitiveFormatter('%(asctime)s - %(levelname)s - %(message)s')
+    handler = logging.FileHandler(log_file)
+    handler.setFormatter(formatter)
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(logging.INFO)
+    return handler
+
+def time_calls(count, interval):
+    # Roughly what the lookup path logs: an info line per lookup plus debug
+    # lines that are normally filtered out, `interval` seconds apart.
+    samples = []
+    for i in range(count):
+        start = time.perf_counter()
+        logging.info(f"Lookup 'ephemeral' finished in {i * 0.001:.1f} ms")
+        logging.debug(f"Lookup 'ephemeral' waited {i * 0.001:.1f} ms")
+        samples.append(time.perf_counter() - start)
+        if interval:
+            time.sleep(interval)
+    samples.sort()
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description="Caller-side cost of logging, synchronous vs queued pipeline")
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--interval", type=float, default=0.0005,
+                        help="seconds between calls; 0 logs as one burst")
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.TemporaryDirectory()
+    legacy_handler = configure_legacy(os.path.join(tmp_dir.name, "legacy.log"))
+    legacy = time_calls(args.calls, args.interval)
+    legacy_handler.close()
+
+    pipeline = start_log_pipeline(os.path.join(tmp_dir.name, "pipeline.log"), max_bytes=1024 * 1024)
+    queued = time_calls(args.calls, args.interval)
+    pipeline.stop()
+
+    for name, samples in (("sync file", legacy), ("queued", queued)):
+        p50 = samples[len(samples) // 2]
+        p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+        print(f"{name:10} p50 {p50 * 1e6:7.2f} us  p99 {p99 * 1e6:8.2f} us  max {samples[-1] * 1e6:9.2f} us")
+    print(f"queued records dropped: {pipeline.handler.dropped}, log files: {sorted(os.listdir(tmp_dir.name))}")
+    tmp_dir.cleanup()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gemini_client import GeminiClient
+from lookup_cache import LookupCache, is_error_result
+from lookup_core import LookupService, is_valid_phrase
+from mock_gemini import MockGeminiServer
+
+DEFAULT_TRACE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "traces", "reading_session.jsonl")
+
+def load_trace(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def run(args):
+    server = MockGeminiServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                              ttft=args.latency / 3, token_delay=args.token_delay, seed=1)
+    client = GeminiClient(api_key="benchmark", base_url=server.start(), retries=args.retries)
+    tmp_dir = tempfile.TemporaryDirectory()
+    cache = None if args.no_cache else LookupCache(os.path.join(tmp_dir.name, "bench_cache.db"))
+    service = LookupService(client, cache=cache, streaming=args.streaming)
+
+    events = load_trace(args.trace) * args.repeat
+    latencies = []
+    service_times = []
+    errors = 0
+    lock = threading.Lock()
+
+    def handle(text, copied_at):
+        nonlocal errors
+        started = time.perf_counter()
+        phrase = is_valid_phrase(text)
+        if not phrase:
+            return
+        meaning, _ = service.lookup(phrase)
+        finished = time.perf_counter()
+        with lock:
+            latencies.append(finished - copied_at)
+            service_times.append(finished - started)
+            if is_error_result(meaning):
+                errors += 1
+
+    tracemalloc.start()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    mem_before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    last_text = None
+    previous_t = events[0]["t"] if events else 0.0
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for event in events:
+            gap = max(0.0, event["t"] - previous_t)
+            previous_t = event["t"]
+            if args.speed > 0 and gap:
+                time.sleep(gap / args.speed)
+            text = event["text"].strip()
+            if text == last_text:
+                continue
+            last_text = text
+            pool.submit(handle, text, time.perf_counter())
+
+    wall = time.perf_counter() - start
+    mem_after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    server.stop()
+    tmp_dir.cleanup()
+
+    ordered = sorted(latencies)
+    ordered_service = sorted(service_times)
+    lookups = len(ordered)
+    return {
+        "version": 1,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "config": {
+            "trace": os.path.basename(args.trace),
+            "repeat": args.repeat,
+            "latency_s": args.latency,
+            "jitter_s": args.jitter,
+            "error_rate": args.error_rate,
+            "streaming": args.streaming,
+            "cache": not args.no_cache,
+            "concurrency": args.concurrency,
+            "speed": args.speed
+        },
+        "events": len(events),
+        "lookups": lookups,
+        "errors": errors,
+        "latency_ms": {
+            "p50": percentile(ordered, 0.50) * 1000,
+            "p95": percentile(ordered, 0.95) * 1000,
+            "p99": percentile(ordered, 0.99) * 1000,
+            "max": (ordered[-1] if ordered else 0.0) * 1000
+        },
+        "service_ms": {
+            "p50": percentile(ordered_service, 0.50) * 1000,
+            "p95": percentile(ordered_service, 0.95) * 1000,
+            "p99": percentile(ordered_service, 0.99) * 1000
+        },
+        "throughput_per_s": lookups / wall if wall else 0.0,
+        "api_calls": server.requests,
+        "api_calls_per_lookup": server.requests / lookups if lookups else 0.0,
+        "memory": {
+            "traced_growth_kib": (mem_after - mem_before) / 1024,
+            "max_rss_growth_kib": rss_after - rss_before
+        },
+        "service": service.stats()
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a clipboard trace through the lookup path against a mock Gemini server")
+    parser.add_argument("--trace", default=DEFAULT_TRACE, help="JSONL file of {\"t\": seconds, \"text\": ...}")
+    parser.add_argument("--repeat", type=int, default=1, help="replay the trace this many times")
+    parser.add_argument("--latency", type=float, default=0.15, help="mock server response latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--token-delay", type=float, default=0.01)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--retries", type=int, default=2)
+    parser.add_argument("--streaming", action="store_true")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--speed", type=float, default=25.0,
+                        help="replay speed relative to the trace timestamps; 0 replays as one burst")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# A local stand-in for the Gemini generateContent / streamGenerateContent
+# endpoints, with configurable latency, streaming pace and error rate.
+# token_latency adds generation time per output token (about 4 characters),
+# and maxOutputTokens cuts the answer short the way the real API does.
+# chatty free-text answers come with a preamble and an example sentence, and
+# drift_rate is the share of them that use **bold** labels instead of the
+# requested "Meaning:" format. Requests for tail_phrases always take
+# tail_latency, on top of the random tail_rate share.
+
+def _answer_for(phrase):
+    return (f"Meaning: a short stand-in meaning for the phrase {phrase} used in local benchmarks\n"
+            f"Synonyms: {phrase}-like, similar to {phrase}, akin to {phrase}")
+
+def _phrases_in(prompt):
+    listed = re.findall(r"^- (.+)$", prompt, re.MULTILINE)
+    if listed:
+        return [p.strip() for p in listed]
+    quoted = re.search(r'"([^"]+)"', prompt)
+    return [quoted.group(1) if quoted else prompt.strip()[:40]]
+
+def _chatty_answer_for(phrase, drift):
+    answer = _answer_for(phrase)
+    if drift:
+        answer = answer.replace("Meaning:", "**Meaning:**").replace("Synonyms:", "**Synonyms:**")
+    return (f"Sure! Here is a short, clear meaning of \"{phrase}\" and three synonyms:\n\n{answer}\n\n"
+            f"Example: You will often come across {phrase} in everyday reading and writing.")
+
+def _entry(phrase, properties):
+    synonyms = [f"{phrase}-like", f"similar to {phrase}", f"akin to {phrase}"]
+    if (properties.get("synonyms") or {}).get("type") == "STRING":
+        synonyms = ", ".join(synonyms)
+    entry = {"phrase": phrase, "meaning": f"a short stand-in meaning for {phrase}", "synonyms": synonyms}
+    return {name: value for name, value in entry.items() if not properties or name in properties}
+
+def _response_text(body, chatty=False, drift=False):
+    prompt = body["contents"][0]["parts"][0]["text"]
+    config = body.get("generationConfig") or {}
+    phrases = _phrases_in(prompt)
+    if config.get("responseMimeType") == "application/json":
+        schema = config.get("responseSchema") or {}
+        if schema.get("type") == "ARRAY":
+            properties = (schema.get("items") or {}).get("properties") or {}
+            return json.dumps([_entry(phrase, properties) for phrase in phrases])
+        return json.dumps(_entry(phrases[0], schema.get("properties") or {}))
+    if chatty:
+        return _chatty_answer_for(phrases[0], drift)
+    return _answer_for(phrases[0])
+
+def _limit_tokens(text, config):
+    # Returns the text as generated, its token count and the finish reason.
+    tokens = -(-len(text) // 4)
+    limit = config.get("maxOutputTokens")
+    if limit and tokens > limit:
+        return text[:limit * 4], limit, "MAX_TOKENS"
+    return text, tokens, "STOP"
+
+class MockGeminiServer:
+    def __init__(self, host="127.0.0.1", port=0, latency=0.2, jitter=0.0, tail_rate=0.0,
+                 tail_latency=1.0, ttft=None, token_delay=0.02, error_rate=0.0,
+                 error_status=500, retry_after=None, seed=None, token_latency=0.0, chatty=False,
+                 drift_rate=0.0, tail_phrases=()):
+        self.latency = latency
+        self.token_latency = token_latency
+        self.chatty = chatty
+        self.drift_rate = drift_rate
+        self.jitter = jitter
+        self.tail_rate = tail_rate
+        self.tail_latency = tail_latency
+        self.tail_phrases = frozenset(tail_phrases)
+        self.ttft = latency / 4 if ttft is None else ttft
+        self.token_delay = token_delay
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.requests = 0
+        self.errors = 0
+        self.cancelled = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1beta"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _delay(self, base, phrases=()):
+        with self._lock:
+            delay = base + self._random.uniform(0, self.jitter)
+            if self.tail_rate and self._random.random() < self.tail_rate:
+                delay = self.tail_latency
+            if self.tail_phrases.intersection(phrases):
+                delay = self.tail_latency
+            fail = self._random.random() < self.error_rate
+            drift = self._random.random() < self.drift_rate
+            self.requests += 1
+            if fail:
+                self.errors += 1
+        return delay, fail, drift
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_HEAD(self):
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    self._send_json(400, {"error": {"message": "invalid JSON"}})
+                    return
+
+                streaming = ":streamGenerateContent" in self.path
+                try:
+                    phrases = _phrases_in(body["contents"][0]["parts"][0]["text"])
+                except (KeyError, IndexError, TypeError):
+                    phrases = []
+                delay, fail, drift = server._delay(server.ttft if streaming else server.latency, phrases)
+                if fail:
+                    time.sleep(delay)
+                    headers = {}
+                    if server.retry_after is not None:
+                        headers["Retry-After"] = str(server.retry_after)
+                    self._send_json(server.error_status, {"error": {"message": "mock failure"}}, headers)
+                    return
+
+                try:
+                    text = _response_text(body, server.chatty, drift)
+                except (KeyError, IndexError, TypeError):
+                    time.sleep(delay)
+                    self._send_json(400, {"error": {"message": "bad request"}})
+                    return
+
+                text, tokens, finish_reason = _limit_tokens(text, body.get("generationConfig") or {})
+                if streaming:
+                    time.sleep(delay)
+                    self._stream(text, finish_reason)
+                else:
+                    time.sleep(delay + tokens * server.token_latency)
+                    self._send_json(200, _candidate(text, finish_reason))
+
+            def _send_json(self, status, payload, headers=None):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                try:
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up on the answer, e.g. a cancelled hedge.
+                    server.cancelled += 1
+                    self.close_connection = True
+
+            def _stream(self, text, finish_reason="STOP"):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                words = re.findall(r"\S+\s*", text)
+                try:
+                    for i in range(0, len(words), 3):
+                        if i:
+                            time.sleep(server.token_delay)
+                        chunk = "".join(words[i:i + 3])
+                        time.sleep(-(-len(chunk) // 4) * server.token_latency)
+                        last = i + 3 >= len(words)
+                        payload = _candidate(chunk, finish_reason if last else None)
+                        event = f"data: {json.dumps(payload)}\r\n\r\n".encode("utf-8")
+                        self.wfile.write(f"{len(event):x}\r\n".encode("ascii") + event + b"\r\n")
+                        self.wfile.flush()
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client closed the stream, e.g. a cancelled hedge.
+                    server.cancelled += 1
+                    self.close_connection = True
+
+        return Handler
+
+def _candidate(text, finish_reason="STOP"):
+    candidate = {"content": {"parts": [{"text": text}], "role": "model"}}
+    if finish_reason:
+        candidate["finishReason"] = finish_reason
+    return {"candidates": [candidate]}
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local mock Gemini server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--ttft", type=float)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--token-latency", type=float, default=0.0, help="generation time per output token (s)")
+    parser.add_argument("--chatty", action="store_true", help="wordy free-text answers")
+    parser.add_argument("--drift-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = MockGeminiServer(port=args.port, latency=args.latency, jitter=args.jitter, ttft=args.ttft,
+                              token_delay=args.token_delay, error_rate=args.error_rate,
+                              error_status=args.error_status, token_latency=args.token_latency,
+                              chatty=args.chatty, drift_rate=args.drift_rate)
+    print(f"Mock Gemini listening on {server.base_url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gemini_client import GeminiClient
+from lookup_cache import LookupCache, is_error_result
+from lookup_core import LookupService
+from mock_gemini import MockGeminiServer
+from paragraph import DifficultWordFilter, load_frequency_table, tokenize
+
+DEFAULT_TABLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "word_frequency.txt")
+
+# Comparatives and adverbs of common words, which must be filtered out.
+COMMON_FORMS = ["bigger", "happier", "louder", "darker", "quickly", "slowly", "sadly"]
+
+def synthetic_text(ranks, words, seed=1, rare_rate=0.02, name_rate=0.01):
+    # Common words drawn with a Zipf-like preference, a sprinkling of made-up
+    # rare words and capitalised names, in sentences of 8-24 words.
+    rng = random.Random(seed)
+    common = sorted(ranks, key=ranks.get)
+    weights = [1.0 / (rank + 1) for rank in range(len(common))]
+    rare = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(7, 12))) for _ in range(200)]
+    names = [word.capitalize() for word in rare[:20]]
+    out = []
+    sentence = []
+    for word in rng.choices(common, weights=weights, k=words):
+        roll = rng.random()
+        if roll < rare_rate:
+            word = rng.choice(rare)
+        elif roll < rare_rate + name_rate:
+            word = rng.choice(names)
+        sentence.append(word)
+        if len(sentence) >= rng.randint(8, 24):
+            sentence[0] = sentence[0].capitalize()
+            out.append(" ".join(sentence) + ".")
+            sentence = []
+    if sentence:
+        out.append(" ".join(sentence) + ".")
+    return " ".join(out)
+
+def check_filter(word_filter):
+    text = f"The dog ran {' and '.join(COMMON_FORMS)} than the cat did."
+    return [f"{word} picked as difficult" for word in word_filter.difficult_words(text) if word in COMMON_FORMS]
+
+def time_call(func, text, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+def main():
+    parser = argparse.ArgumentParser(description="Paragraph mode: word filtering cost and batched lookups")
+    parser.add_argument("--table", default=DEFAULT_TABLE)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.3, help="mock Gemini latency (s)")
+    args = parser.parse_args()
+
+    ranks = load_frequency_table(args.table)
+    word_filter = DifficultWordFilter(ranks)
+    failures = check_filter(word_filter)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"filter check: {len(COMMON_FORMS)} forms of common words filtered out\n")
+    print(f"{'paste':>12} {'tokenize':>10} {'tokenize+filter':>16} {'distinct':>9} {'difficult':>10}")
+    for words in (100, 1000, 10000, 50000):
+        text = synthetic_text(ranks, words)
+        tokenize_time = time_call(tokenize, text, args.repeat)
+        filter_time = time_call(word_filter.difficult_words, text, args.repeat)
+        unbounded = DifficultWordFilter(ranks, max_words=sys.maxsize).difficult_words(text)
+        print(f"{words:>6} words {tokenize_time * 1000:8.2f}ms {filter_time * 1000:14.2f}ms "
+              f"{len(set(tokenize(text))):>9} {len(unbounded):>10}")
+
+    # Resolving the words picked from a 1000-word paste, one request per word
+    # against the cache-aware batched path.
+    text = synthetic_text(ranks, 1000, seed=2)
+    words = word_filter.difficult_words(text)
+    server = MockGeminiServer(latency=args.latency, seed=1)
+    client = GeminiClient(api_key="benchmark", base_url=server.start())
+    tmp_dir = tempfile.TemporaryDirectory()
+    print(f"\nresolving {len(words)} difficult words, mock latency {args.latency * 1000:.0f} ms")
+    for name in ("one by one", "batched", "batched, half cached"):
+        cache = LookupCache(os.path.join(tmp_dir.name, f"{name}.db"))
+        service = LookupService(client, cache=cache, streaming=False)
+        if name == "batched, half cached":
+            service.lookup_many(words[::2])
+        requests_before = server.requests
+        start = time.perf_counter()
+        if name == "one by one":
+            entries = [(word,) + tuple(service.lookup(word)) for word in words]
+        else:
+            entries = service.lookup_many(words)
+        elapsed = time.perf_counter() - start
+        errors = sum(1 for _, meaning, _ in entries if is_error_result(meaning))
+        print(f"{name:22} {elapsed * 1000:8.1f} ms  gemini requests {server.requests - requests_before:3}  "
+              f"errors {errors}")
+        cache.close()
+    server.stop()
+    tmp_dir.cleanup()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gemini_client import GeminiClient
+from generation_profile import StructuredProfile, TextProfile
+from lookup_cache import is_error_result
+from lookup_core import get_meaning_and_synonyms_from_gemini, get_meaning_and_synonyms_from_gemini_stream
+from mock_gemini import MockGeminiServer
+
+PROFILES = [
+    ("text (free-text parsing)", TextProfile()),
+    ("structured, uncapped", StructuredProfile(max_output_tokens=None, temperature=None)),
+    ("structured (default)", StructuredProfile()),
+    ("structured, string synonyms", StructuredProfile(max_output_tokens=64, synonym_list=False)),
+    ("structured, 16 tokens", StructuredProfile(max_output_tokens=16)),
+]
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def main():
+    parser = argparse.ArgumentParser(description="Generation profiles: latency and usable answers")
+    parser.add_argument("--lookups", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.15, help="mock latency before generation (s)")
+    parser.add_argument("--token-latency", type=float, default=0.004, help="mock generation time per token (s)")
+    parser.add_argument("--drift-rate", type=float, default=0.05,
+                        help="share of free-text answers that ignore the requested format")
+    args = parser.parse_args()
+
+    server = MockGeminiServer(latency=args.latency, ttft=args.latency, token_delay=0.0,
+                              token_latency=args.token_latency, chatty=True, drift_rate=args.drift_rate, seed=1)
+    client = GeminiClient(api_key="benchmark", base_url=server.start())
+    client.generate_content("warmup")
+
+    print(f"mock latency {args.latency * 1000:.0f} ms + {args.token_latency * 1000:.1f} ms/token, "
+          f"{args.drift_rate:.0%} of free-text answers off-format, {args.lookups} lookups per profile")
+    print(f"{'profile':30} {'prompt':>7} {'p50':>8} {'p90':>8} {'first paint':>12} {'usable':>7}")
+    for name, profile in PROFILES:
+        full, painted, usable = [], [], 0
+        for i in range(args.lookups):
+            phrase = f"word{i}"
+            start = time.perf_counter()
+            meaning, _ = get_meaning_and_synonyms_from_gemini(client, phrase, profile)
+            full.append(time.perf_counter() - start)
+            if meaning and not is_error_result(meaning):
+                usable += 1
+
+            first = []
+            start = time.perf_counter()
+            get_meaning_and_synonyms_from_gemini_stream(
+                client, phrase, lambda *_: first or first.append(time.perf_counter() - start), profile)
+            painted.append(first[0] if first else time.perf_counter() - start)
+        print(f"{name:30} {len(profile.prompt('word0')):>6}c {percentile(full, 0.5) * 1000:6.1f}ms "
+              f"{percentile(full, 0.9) * 1000:6.1f}ms {percentile(painted, 0.5) * 1000:10.1f}ms "
+              f"{usable / args.lookups:7.0%}")
+    client.close()
+    server.stop()
+
+if __name__ == "__main__":
+    main()
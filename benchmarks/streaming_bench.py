@@ -0,0 +1,58 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gemini_client import GeminiClient, parse_answer_text
+from mock_gemini import MockGeminiServer
+
+def prompt_for(phrase):
+    return (
+        f"Provide a short, clear meaning and 3 synonyms for the word or phrase: \"{phrase}\".\n"
+        "Format your answer like this:\nMeaning: <meaning here>\nSynonyms: synonym1, synonym2, synonym3"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Time to first paint: streaming vs full responses")
+    parser.add_argument("--lookups", type=int, default=20)
+    parser.add_argument("--ttft", type=float, default=0.15, help="mock time to first token (s)")
+    parser.add_argument("--token-delay", type=float, default=0.04, help="mock delay between chunks (s)")
+    args = parser.parse_args()
+
+    # Non-streaming responses arrive only once generation is complete.
+    chunks = 10
+    server = MockGeminiServer(latency=args.ttft + chunks * args.token_delay,
+                              ttft=args.ttft, token_delay=args.token_delay)
+    client = GeminiClient(api_key="benchmark", base_url=server.start())
+    client.generate_content(prompt_for("warmup"))
+
+    full, first_paint, stream_total = [], [], []
+    for i in range(args.lookups):
+        prompt = prompt_for(f"word{i}")
+
+        start = time.perf_counter()
+        response = client.generate_content(prompt)
+        parse_answer_text(response["candidates"][0]["content"]["parts"][0]["text"])
+        full.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        answer = ""
+        painted = None
+        for chunk in client.stream_generate_content(prompt):
+            answer += chunk
+            if painted is None and parse_answer_text(answer)[0]:
+                painted = time.perf_counter() - start
+        stream_total.append(time.perf_counter() - start)
+        first_paint.append(painted if painted is not None else stream_total[-1])
+
+    server.stop()
+    for name, samples in (("full response", full), ("stream first paint", first_paint),
+                          ("stream complete", stream_total)):
+        print(f"{name:19} median={statistics.median(samples) * 1000:7.1f} ms  "
+              f"max={max(samples) * 1000:7.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import argparse
+import itertools
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lookup_core import PhraseValidator
+
+def legacy_is_valid_phrase(text):
+    # The validator as it was before PhraseValidator, for comparison.
+    text = re.sub(r'\s+', ' ', text.strip())
+    if 1 <= len(text.split()) <= 3 and re.fullmatch(r'[A-Za-z ]+', text):
+        return text
+    return None
+
+def inputs():
+    paragraph = "The quick brown fox jumps over the lazy dog, again and again. " * 4
+    document = paragraph * (1024 * 1024 // len(paragraph))
+    return (
+        ("word", "ephemeral"),
+        ("phrase", "  pragmatic   approach  "),
+        ("rejected", "user@example.com"),
+        ("paragraph", paragraph),
+        ("1 MiB", document),
+        ("10 MiB", document * 10)
+    )
+
+def time_per_call(func, text, budget):
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        func(text)
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= budget:
+            return elapsed / calls
+
+def main():
+    parser = argparse.ArgumentParser(description="Phrase validation cost on small and huge clipboard contents")
+    parser.add_argument("--budget", type=float, default=0.5, help="seconds to spend per case")
+    args = parser.parse_args()
+
+    strict = PhraseValidator()
+    relaxed = PhraseValidator(unicode=True, hyphens=True, apostrophes=True, max_words=4)
+    print(f"{'input':10} {'legacy':>12} {'new, changed':>14} {'new, repeat':>13} {'relaxed rules':>14}")
+    for name, text in inputs():
+        # Alternating between two different strings defeats the repeat
+        # check, as new clipboard content would.
+        next_variant = itertools.cycle((text, text.swapcase())).__next__
+        legacy = time_per_call(legacy_is_valid_phrase, text, args.budget)
+        changed = time_per_call(lambda _: strict(next_variant()), text, args.budget)
+        repeat = time_per_call(strict, text, args.budget)
+        custom = time_per_call(lambda _: relaxed(next_variant()), text, args.budget)
+        print(f"{name:10} {legacy * 1e6:10.2f}us {changed * 1e6:12.2f}us {repeat * 1e6:11.2f}us "
+              f"{custom * 1e6:12.2f}us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from lookup_cache import is_error_result
+from lookup_core import error_result, is_valid_phrase
+from rate_limiter import PRIORITY_BATCH
+
+# Headless glossary generation: a word list in, one JSON line per word out.
+# Words are sent to LookupService.lookup_many in batches, a few batches at a
+# time, so cached words cost nothing and the rest share Gemini requests.
+# The output file is the checkpoint: a rerun with the same output skips every
+# word that already has an answer there and appends the rest, so an
+# interrupted run resumes without spending quota twice. Failed words are
+# written with an "error" field and retried on the next run. Answers borrowed
+# from a similar known word (fuzzy matching) are never written: a guess in
+# the output would count as done and never be looked up properly.
+
+def read_words(path):
+    handle = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    try:
+        for line in handle:
+            word = line.split("\t", 1)[0].strip()
+            if word and not word.startswith("#"):
+                yield word
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+def load_completed(path):
+    # Words with an answer in an earlier run's output. A line cut short by a
+    # crash is dropped from the file so appending starts on a clean line.
+    completed = set()
+    if path == "-" or not os.path.exists(path):
+        return completed
+    with open(path, "rb+") as f:
+        good_end = 0
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            good_end += len(line)
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if "error" not in entry:
+                completed.add(entry["phrase"])
+        f.truncate(good_end)
+    return completed
+
+class BulkLookup:
+    def __init__(self, service, output_path, workers=4, batch_size=8, validate=is_valid_phrase,
+                 limiter=None, report_interval=10.0, report=None):
+        self.service = service
+        self.output_path = output_path
+        self.workers = workers
+        self.batch_size = batch_size
+        self.validate = validate
+        self.limiter = limiter
+        self.report_interval = report_interval
+        self.report = report or (lambda line: print(line, file=sys.stderr, flush=True))
+        self.started = None
+        self.stop_reason = None
+        self.counts = {"resolved": 0, "errors": 0, "resumed": 0, "duplicates": 0, "invalid": 0}
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(workers * 2)
+        self._output = None
+
+    def run(self, words):
+        self.started = time.perf_counter()
+        completed = load_completed(self.output_path)
+        if completed:
+            self.report(f"Resuming: {len(completed)} words already done in {self.output_path}")
+        self._output = sys.stdout if self.output_path == "-" else open(self.output_path, "a", encoding="utf-8")
+        stop_reporting = threading.Event()
+        reporter = threading.Thread(target=self._report_loop, args=(stop_reporting,), name="bulk-report", daemon=True)
+        reporter.start()
+        seen = set(completed)
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bulk-lookup") as executor:
+                try:
+                    batch = []
+                    for word in words:
+                        phrase = self.validate(word)
+                        if not phrase:
+                            self._count("invalid")
+                            continue
+                        if phrase in seen:
+                            self._count("resumed" if phrase in completed else "duplicates")
+                            continue
+                        seen.add(phrase)
+                        batch.append(phrase)
+                        if len(batch) >= self.batch_size:
+                            if not self._submit(executor, batch):
+                                break
+                            batch = []
+                    else:
+                        if batch:
+                            self._submit(executor, batch)
+                except KeyboardInterrupt:
+                    self.stop_reason = "interrupted"
+                    self.report("Interrupted, finishing the lookups in flight")
+        finally:
+            stop_reporting.set()
+            if self._output is not sys.stdout:
+                self._output.close()
+            else:
+                self._output.flush()
+        self.report(self.progress_line("Finished" if not self.stop_reason else f"Stopped ({self.stop_reason})"))
+        return self.counts
+
+    def _submit(self, executor, batch):
+        # Reading the word list waits here once workers * 2 batches are
+        # queued, so a long list is never held in memory.
+        if self.limiter and not self.limiter.has_quota(PRIORITY_BATCH):
+            self.stop_reason = "daily quota reached, rerun tomorrow to continue"
+            return False
+        self._slots.acquire()
+        try:
+            executor.submit(self._resolve, list(batch))
+        except Exception:
+            self._slots.release()
+            raise
+        return True
+
+    def _resolve(self, batch):
+        try:
+            try:
+                if self.limiter:
+                    with self.limiter.priority(PRIORITY_BATCH):
+                        entries = self.service.lookup_many(batch, fuzzy=False)
+                else:
+                    entries = self.service.lookup_many(batch, fuzzy=False)
+            except Exception as e:
+                logging.error(f"Bulk lookup of {len(batch)} words failed: {str(e)}")
+                entries = [(phrase,) + error_result(str(e)) for phrase in batch]
+            self._write(entries)
+        finally:
+            self._slots.release()
+
+    def _write(self, entries):
+        lines = []
+        errors = 0
+        for phrase, meaning, synonyms in entries:
+            if is_error_result(meaning):
+                errors += 1
+                entry = {"phrase": phrase, "error": meaning.replace("⚠️ Error: ", "", 1)}
+            else:
+                entry = {"phrase": phrase, "meaning": meaning, "synonyms": synonyms}
+            lines.append(json.dumps(entry, ensure_ascii=False) + "\n")
+        with self._lock:
+            self._output.write("".join(lines))
+            self._output.flush()
+            self.counts["resolved"] += len(entries) - errors
+            self.counts["errors"] += errors
+
+    def _count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def _report_loop(self, stop):
+        last_sync = time.monotonic()
+        while not stop.wait(self.report_interval):
+            self.report(self.progress_line("Progress"))
+            if self._output is not sys.stdout and time.monotonic() - last_sync >= 30:
+                with self._lock:
+                    if not self._output.closed:
+                        os.fsync(self._output.fileno())
+                last_sync = time.monotonic()
+
+    def progress_line(self, label):
+        elapsed = time.perf_counter() - self.started
+        with self._lock:
+            counts = dict(self.counts)
+        done = counts["resolved"] + counts["errors"]
+        line = (f"{label}: {counts['resolved']} resolved, {counts['errors']} errors, "
+                f"{counts['resumed']} already done, {counts['duplicates'] + counts['invalid']} skipped "
+                f"in {elapsed:.1f}s ({done / elapsed if elapsed else 0:.1f} words/s)")
+        stats = self.service.stats()
+        if "tier_hits" in stats:
+            line += f", tier hits {stats['tier_hits']}"
+        return line
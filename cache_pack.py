@@ -0,0 +1,360 @@
+import argparse
+import glob
+import json
+import logging
+import mmap
+import os
+import sqlite3
+import struct
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from local_dictionary import FIELD_SEP, normalize_headword
+from lookup_cache import is_error_result
+from lookup_core import is_valid_phrase
+
+# Prebuilt lookup results, shipped with the installer or dropped into the app
+# data directory, so a fresh install starts with the vocabulary other
+# machines have already paid for. Packs sit under the local cache as a
+# read-only tier and are never written to.
+#
+# File layout, all little-endian:
+#   header   magic, version, flags, entry count, block count, build time,
+#            source count, offsets of the four sections
+#   index    one (key offset, block, key length, record offset, record length)
+#            per entry, sorted by key so lookups are a binary search over the
+#            mapped file
+#   keys     concatenated UTF-8 keys (normalized like dictionary headwords)
+#   blocks   one (offset, length) per block
+#   data     zlib-compressed blocks of "meaning\x1fsynonyms" records, each
+#            holding about BLOCK_SIZE bytes of consecutive records
+MAGIC = b"WLPK"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIIQIQQQQ")
+ENTRY = struct.Struct("<IIHHH")
+BLOCK = struct.Struct("<II")
+BLOCK_SIZE = 16 * 1024
+MAX_RECORD = 0xFFFF
+
+def build_pack(entries, path, sources=1, block_size=BLOCK_SIZE):
+    records = {}
+    for phrase, meaning, synonyms in entries:
+        key = normalize_headword(phrase).encode("utf-8")
+        record = f"{meaning}{FIELD_SEP}{synonyms}".encode("utf-8")
+        if key and len(key) <= MAX_RECORD and len(record) <= MAX_RECORD and not is_error_result(meaning):
+            records.setdefault(key, record)
+
+    keys = sorted(records)
+    index = bytearray()
+    key_blob = bytearray()
+    block_table = bytearray()
+    data_blob = bytearray()
+    block = bytearray()
+
+    def flush_block():
+        compressed = zlib.compress(bytes(block), 9)
+        block_table.extend(BLOCK.pack(len(data_blob), len(compressed)))
+        data_blob.extend(compressed)
+        block.clear()
+
+    for key in keys:
+        record = records[key]
+        if block and len(block) + len(record) > block_size:
+            flush_block()
+        index += ENTRY.pack(len(key_blob), len(block_table) // BLOCK.size, len(key), len(block), len(record))
+        key_blob += key
+        block += record
+    if block:
+        flush_block()
+
+    index_offset = HEADER.size
+    keys_offset = index_offset + len(index)
+    blocks_offset = keys_offset + len(key_blob)
+    data_offset = blocks_offset + len(block_table)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(keys), len(block_table) // BLOCK.size, int(time.time()),
+                            sources, index_offset, keys_offset, blocks_offset, data_offset))
+        f.write(index)
+        f.write(key_blob)
+        f.write(block_table)
+        f.write(data_blob)
+    os.replace(tmp_path, path)
+    return len(keys)
+
+class CachePack:
+    # Lookups binary-search the mapped index and decompress one block; the
+    # last few blocks are kept decompressed, since words looked up together
+    # tend to be looked up again.
+    def __init__(self, path, cached_blocks=8):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            (magic, version, _, count, block_count, created, sources,
+             index_offset, keys_offset, blocks_offset, data_offset) = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a version {VERSION} cache pack")
+        except Exception:
+            self._file.close()
+            raise
+        self.count = count
+        self.block_count = block_count
+        self.created = created
+        self.sources = sources
+        self._index_offset = index_offset
+        self._keys_offset = keys_offset
+        self._blocks_offset = blocks_offset
+        self._data_offset = data_offset
+        self._cached_blocks = cached_blocks
+        self._blocks = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.count
+
+    def _key_at(self, i):
+        key_off, _, key_len, _, _ = ENTRY.unpack_from(self._map, self._index_offset + i * ENTRY.size)
+        start = self._keys_offset + key_off
+        return self._map[start:start + key_len]
+
+    def _find(self, key):
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self._key_at(lo) == key:
+            return lo
+        return -1
+
+    def _block(self, number):
+        with self._lock:
+            data = self._blocks.get(number)
+            if data is not None:
+                self._blocks.move_to_end(number)
+                return data
+        offset, length = BLOCK.unpack_from(self._map, self._blocks_offset + number * BLOCK.size)
+        start = self._data_offset + offset
+        data = zlib.decompress(self._map[start:start + length])
+        with self._lock:
+            self._blocks[number] = data
+            while len(self._blocks) > self._cached_blocks:
+                self._blocks.popitem(last=False)
+        return data
+
+    def get(self, phrase):
+        i = self._find(normalize_headword(phrase).encode("utf-8"))
+        if i < 0:
+            return None
+        _, block, _, rec_off, rec_len = ENTRY.unpack_from(self._map, self._index_offset + i * ENTRY.size)
+        record = self._block(block)[rec_off:rec_off + rec_len]
+        meaning, _, synonyms = record.decode("utf-8").partition(FIELD_SEP)
+        return meaning, synonyms
+
+    def __contains__(self, phrase):
+        return self._find(normalize_headword(phrase).encode("utf-8")) >= 0
+
+    def headwords(self):
+        for i in range(self.count):
+            yield self._key_at(i).decode("utf-8")
+
+    def entries(self):
+        for i in range(self.count):
+            _, block, _, rec_off, rec_len = ENTRY.unpack_from(self._map, self._index_offset + i * ENTRY.size)
+            meaning, _, synonyms = self._block(block)[rec_off:rec_off + rec_len].decode("utf-8").partition(FIELD_SEP)
+            yield self._key_at(i).decode("utf-8"), meaning, synonyms
+
+    def info(self):
+        return {
+            "path": self.path,
+            "version": VERSION,
+            "entries": self.count,
+            "blocks": self.block_count,
+            "sources": self.sources,
+            "built": time.strftime("%Y-%m-%d %H:%M", time.localtime(self.created)),
+            "size_bytes": len(self._map),
+            "data_bytes": len(self._map) - self._data_offset
+        }
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+class CachePacks:
+    # Several packs searched as one; the first pack listed wins.
+    def __init__(self, packs):
+        self.packs = list(packs)
+
+    def __len__(self):
+        return sum(len(pack) for pack in self.packs)
+
+    def get(self, phrase):
+        for pack in self.packs:
+            result = pack.get(phrase)
+            if result:
+                return result
+        return None
+
+    def headwords(self):
+        for pack in self.packs:
+            yield from pack.headwords()
+
+    def close(self):
+        for pack in self.packs:
+            pack.close()
+
+def find_pack_paths(directories):
+    # Newest first within each directory, so a pack dropped in later
+    # overrides answers from an older one.
+    paths = []
+    for directory in directories:
+        if directory and os.path.isdir(directory):
+            found = glob.glob(os.path.join(directory, "*.wlpk"))
+            paths.extend(sorted(found, key=os.path.getmtime, reverse=True))
+    return paths
+
+def open_cache_packs(paths):
+    packs = []
+    seen = set()
+    for path in paths:
+        real_path = os.path.realpath(path)
+        if real_path in seen:
+            continue
+        seen.add(real_path)
+        try:
+            pack = CachePack(path)
+            packs.append(pack)
+            logging.info(f"Loaded cache pack with {len(pack)} entries from {path}")
+        except Exception as e:
+            logging.error(f"Failed to load cache pack {path}: {str(e)}")
+    return CachePacks(packs) if packs else None
+
+def read_source(path):
+    # Either a lookup_cache.db copied from a machine or an earlier pack.
+    with open(path, "rb") as f:
+        is_pack = f.read(len(MAGIC)) == MAGIC
+    if is_pack:
+        pack = CachePack(path)
+        try:
+            yield from ((phrase, meaning, synonyms, pack.created) for phrase, meaning, synonyms in pack.entries())
+        finally:
+            pack.close()
+        return
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        yield from conn.execute("SELECT phrase, meaning, synonyms, created FROM lookups")
+    finally:
+        conn.close()
+
+def merge_sources(paths, min_sources=1, max_entries=None):
+    # Deduplicates across sources by normalized phrase. When sources
+    # disagree, the answer most of them hold wins, then the newest.
+    # min_sources > 1 keeps only words several machines looked up, which
+    # leaves out anything personal to one user.
+    answers = {}
+    sources = {}
+    for path in paths:
+        for phrase, meaning, synonyms, created in read_source(path):
+            if is_error_result(meaning):
+                continue
+            key = normalize_headword(phrase)
+            found = sources.setdefault(key, [0, None])
+            if found[1] != path:
+                found[0] += 1
+                found[1] = path
+            vote = answers.setdefault(key, {}).setdefault((meaning, synonyms), [0, 0, None])
+            if vote[2] != path:
+                vote[0] += 1
+                vote[2] = path
+            vote[1] = max(vote[1], created)
+
+    merged = []
+    for key, by_answer in answers.items():
+        count = sources[key][0]
+        if count < min_sources:
+            continue
+        meaning, synonyms = max(by_answer, key=lambda answer: by_answer[answer][:2])
+        merged.append((count, key, meaning, synonyms))
+    merged.sort(key=lambda entry: (-entry[0], entry[1]))
+    if max_entries:
+        merged = merged[:max_entries]
+    return [(key, meaning, synonyms) for _, key, meaning, synonyms in merged]
+
+def replay_hit_ratio(texts, tiers, validate):
+    # Replays copied texts as a fresh install would see them: an empty local
+    # cache that fills with every remote answer, plus the given tiers.
+    seen = set()
+    counts = {"lookups": 0, "cache": 0, "remote": 0}
+    counts.update({name: 0 for name, _ in tiers})
+    for text in texts:
+        phrase = validate(text)
+        if not phrase:
+            continue
+        counts["lookups"] += 1
+        if phrase in seen:
+            counts["cache"] += 1
+            continue
+        for name, get in tiers:
+            if get(phrase):
+                counts[name] += 1
+                break
+        else:
+            counts["remote"] += 1
+            seen.add(phrase)
+    lookups = counts["lookups"] or 1
+    counts["hit_ratio"] = round(1 - counts["remote"] / lookups, 3)
+    return counts
+
+def read_trace(path):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)["text"]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build, inspect or evaluate Word Lookup cache packs")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="merge lookup_cache.db files and packs into one pack")
+    build.add_argument("output")
+    build.add_argument("sources", nargs="+", help="lookup_cache.db files or .wlpk packs")
+    build.add_argument("--min-sources", type=int, default=1, help="keep words found in at least this many sources")
+    build.add_argument("--max-entries", type=int, help="keep only the most widely shared words")
+    info = sub.add_parser("info", help="describe a pack")
+    info.add_argument("pack")
+    query = sub.add_parser("lookup", help="look a word up in a pack")
+    query.add_argument("pack")
+    query.add_argument("word")
+    replay = sub.add_parser("hit-ratio", help="replay a copy trace (JSONL with a \"text\" field) against packs")
+    replay.add_argument("trace")
+    replay.add_argument("packs", nargs="+")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        start = time.perf_counter()
+        entries = merge_sources(args.sources, args.min_sources, args.max_entries)
+        count = build_pack(entries, args.output, sources=len(args.sources))
+        print(f"Wrote {count} entries from {len(args.sources)} sources to {args.output} "
+              f"({os.path.getsize(args.output) / 1024:.0f} KiB) in {time.perf_counter() - start:.2f} s")
+    elif args.command == "info":
+        pack = CachePack(args.pack)
+        print(json.dumps(pack.info(), indent=2))
+    elif args.command == "lookup":
+        result = CachePack(args.pack).get(args.word)
+        if result is None:
+            print(f"{args.word}: not found")
+            return 1
+        print(f"{args.word}:\nMeaning: {result[0]}\nSynonyms: {result[1]}")
+    else:
+        packs = open_cache_packs(args.packs)
+        tiers = [("pack", packs.get)] if packs else []
+        print(json.dumps(replay_hit_ratio(read_trace(args.trace), tiers, is_valid_phrase), indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+import logging
+import sys
+import threading
+import time
+
+def _default_paste():
+    import pyperclip
+    return pyperclip.paste()
+
+class ClipboardSource:
+    name = "base"
+
+    def wait_for_change(self, timeout=None):
+        raise NotImplementedError
+
+    def read(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class PollingClipboardSource(ClipboardSource):
+    name = "polling"
+
+    def __init__(self, interval=0.3, paste=None):
+        self.interval = interval
+        self.paste = paste or _default_paste
+        self._last = None
+
+    def wait_for_change(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            time.sleep(self.interval)
+            text = self.paste()
+            if text != self._last:
+                self._last = text
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+
+    def read(self):
+        if self._last is None:
+            self._last = self.paste()
+        return self._last
+
+class SequenceClipboardSource(ClipboardSource):
+    name = "sequence"
+
+    def __init__(self, interval=0.02, get_sequence=None, paste=None):
+        self.interval = interval
+        self.paste = paste or _default_paste
+        if get_sequence is None:
+            import ctypes
+            get_sequence = ctypes.windll.user32.GetClipboardSequenceNumber
+        self.get_sequence = get_sequence
+        self._last_sequence = get_sequence()
+
+    def wait_for_change(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            sequence = self.get_sequence()
+            if sequence != self._last_sequence:
+                self._last_sequence = sequence
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(self.interval)
+
+    def read(self):
+        return self.paste()
+
+class Win32ListenerClipboardSource(ClipboardSource):
+    name = "listener"
+
+    WM_DESTROY = 0x0002
+    WM_CLOSE = 0x0010
+    WM_CLIPBOARDUPDATE = 0x031D
+    HWND_MESSAGE = -3
+
+    def __init__(self, paste=None):
+        self.paste = paste or _default_paste
+        self._changed = threading.Event()
+        self._ready = threading.Event()
+        self._error = None
+        self._hwnd = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+        if self._error or not self._hwnd:
+            raise OSError(f"Clipboard listener failed to start: {self._error}")
+
+    def _run(self):
+        import ctypes
+        from ctypes import wintypes
+
+        try:
+            user32 = ctypes.WinDLL("user32", use_last_error=True)
+            kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+            LRESULT = wintypes.LPARAM
+            WNDPROC = ctypes.WINFUNCTYPE(LRESULT, wintypes.HWND, wintypes.UINT,
+                                         wintypes.WPARAM, wintypes.LPARAM)
+
+            class WNDCLASSW(ctypes.Structure):
+                _fields_ = [
+                    ("style", wintypes.UINT),
+                    ("lpfnWndProc", WNDPROC),
+                    ("cbClsExtra", ctypes.c_int),
+                    ("cbWndExtra", ctypes.c_int),
+                    ("hInstance", wintypes.HINSTANCE),
+                    ("hIcon", wintypes.HICON),
+                    ("hCursor", wintypes.HANDLE),
+                    ("hbrBackground", wintypes.HBRUSH),
+                    ("lpszMenuName", wintypes.LPCWSTR),
+                    ("lpszClassName", wintypes.LPCWSTR)
+                ]
+
+            user32.DefWindowProcW.argtypes = [wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM]
+            user32.DefWindowProcW.restype = LRESULT
+            user32.CreateWindowExW.argtypes = [
+                wintypes.DWORD, wintypes.LPCWSTR, wintypes.LPCWSTR, wintypes.DWORD,
+                ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                wintypes.HWND, wintypes.HMENU, wintypes.HINSTANCE, wintypes.LPVOID
+            ]
+            user32.CreateWindowExW.restype = wintypes.HWND
+            user32.AddClipboardFormatListener.argtypes = [wintypes.HWND]
+            user32.RemoveClipboardFormatListener.argtypes = [wintypes.HWND]
+            user32.PostMessageW.argtypes = [wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM]
+            kernel32.GetModuleHandleW.restype = wintypes.HMODULE
+
+            def wnd_proc(hwnd, msg, wparam, lparam):
+                if msg == self.WM_CLIPBOARDUPDATE:
+                    self._changed.set()
+                    return 0
+                if msg == self.WM_DESTROY:
+                    user32.RemoveClipboardFormatListener(hwnd)
+                    user32.PostQuitMessage(0)
+                    return 0
+                return user32.DefWindowProcW(hwnd, msg, wparam, lparam)
+
+            self._wnd_proc = WNDPROC(wnd_proc)
+            class_name = "WordLookupClipboardListener"
+            wc = WNDCLASSW()
+            wc.lpfnWndProc = self._wnd_proc
+            wc.hInstance = kernel32.GetModuleHandleW(None)
+            wc.lpszClassName = class_name
+            user32.RegisterClassW(ctypes.byref(wc))
+
+            hwnd = user32.CreateWindowExW(0, class_name, class_name, 0, 0, 0, 0, 0,
+                                          wintypes.HWND(self.HWND_MESSAGE), None, wc.hInstance, None)
+            if not hwnd:
+                raise ctypes.WinError(ctypes.get_last_error())
+            if not user32.AddClipboardFormatListener(hwnd):
+                user32.DestroyWindow(hwnd)
+                raise ctypes.WinError(ctypes.get_last_error())
+            self._user32 = user32
+            self._hwnd = hwnd
+        except Exception as e:
+            self._error = e
+            self._ready.set()
+            return
+
+        self._ready.set()
+        msg = wintypes.MSG()
+        while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+            user32.TranslateMessage(ctypes.byref(msg))
+            user32.DispatchMessageW(ctypes.byref(msg))
+
+    def wait_for_change(self, timeout=None):
+        if self._changed.wait(timeout):
+            self._changed.clear()
+            return True
+        return False
+
+    def read(self):
+        return self.paste()
+
+    def close(self):
+        if self._hwnd:
+            self._user32.PostMessageW(self._hwnd, self.WM_CLOSE, 0, 0)
+            self._hwnd = None
+
+class FakeClipboardSource(ClipboardSource):
+    name = "fake"
+
+    def __init__(self, text=""):
+        self._text = text
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._changed = threading.Event()
+
+    def copy(self, text):
+        with self._lock:
+            self._text = text
+            self._sequence += 1
+        self._changed.set()
+
+    def paste(self):
+        with self._lock:
+            return self._text
+
+    def sequence_number(self):
+        with self._lock:
+            return self._sequence
+
+    def wait_for_change(self, timeout=None):
+        if self._changed.wait(timeout):
+            self._changed.clear()
+            return True
+        return False
+
+    def read(self):
+        return self.paste()
+
+def create_clipboard_source(backend="auto", interval=0.3):
+    backend = (backend or "auto").lower()
+    if backend == "fake":
+        return FakeClipboardSource()
+    if backend == "polling":
+        return PollingClipboardSource(interval=interval)
+
+    if sys.platform == "win32":
+        if backend in ("auto", "listener"):
+            try:
+                return Win32ListenerClipboardSource()
+            except Exception as e:
+                logging.warning(f"Clipboard listener unavailable: {e}")
+        if backend in ("auto", "listener", "sequence"):
+            try:
+                return SequenceClipboardSource()
+            except Exception as e:
+                logging.warning(f"Clipboard sequence numbers unavailable: {e}")
+    elif backend not in ("auto",):
+        logging.warning(f"Clipboard backend '{backend}' is not supported on {sys.platform}")
+
+    return PollingClipboardSource(interval=interval)
@@ -0,0 +1,179 @@
+import threading
+import time
+from array import array
+
+# Resident store for (phrase, meaning, synonyms) records that keeps no Python
+# objects per entry. Phrases and meanings are UTF-8 packed into two
+# bytearrays addressed by offset arrays, synonyms are IDs into a shared
+# vocabulary (the same few thousand words recur across entries), and phrases
+# are found through an open-addressing hash table of record numbers. Each
+# record also keeps the time it was created, for expiry.
+# Replacing a phrase appends a new record; the old bytes are reclaimed by
+# compact(), which runs on its own once half the records are dead.
+
+EMPTY = -1
+
+class CompactRecord:
+    __slots__ = ("_store", "_id")
+
+    def __init__(self, store, record_id):
+        self._store = store
+        self._id = record_id
+
+    @property
+    def phrase(self):
+        return self._store._phrase(self._id)
+
+    @property
+    def meaning(self):
+        return self._store._meaning(self._id)
+
+    @property
+    def synonyms(self):
+        return self._store._synonyms(self._id)
+
+    @property
+    def created(self):
+        return self._store._created[self._id]
+
+    def as_tuple(self):
+        return self.phrase, self.meaning, self.synonyms, self.created
+
+    def __repr__(self):
+        return f"CompactRecord({self.phrase!r})"
+
+class CompactStore:
+    def __init__(self, capacity=1024):
+        self._lock = threading.RLock()
+        self._phrases = bytearray()
+        self._meanings = bytearray()
+        self._phrase_offsets = array("I", [0])
+        self._meaning_offsets = array("I", [0])
+        self._synonym_offsets = array("I", [0])
+        self._synonym_ids = array("I")
+        self._hashes = array("q")
+        self._created = array("d")
+        self._vocab = []
+        self._vocab_ids = {}
+        self._live = 0
+        size = 8
+        while size < capacity * 2:
+            size *= 2
+        self._table = array("i", [EMPTY]) * size
+
+    def __len__(self):
+        return self._live
+
+    def get(self, phrase):
+        with self._lock:
+            record_id = self._find(phrase)[1]
+            if record_id == EMPTY:
+                return None
+            return self._meaning(record_id), self._synonyms(record_id)
+
+    def record(self, phrase):
+        with self._lock:
+            record_id = self._find(phrase)[1]
+            return None if record_id == EMPTY else CompactRecord(self, record_id)
+
+    def __contains__(self, phrase):
+        return self.get(phrase) is not None
+
+    def __iter__(self):
+        with self._lock:
+            ids = [record_id for record_id in self._table if record_id != EMPTY]
+        for record_id in sorted(ids):
+            yield CompactRecord(self, record_id)
+
+    def put(self, phrase, meaning, synonyms, created=None):
+        with self._lock:
+            slot, existing = self._find(phrase)
+            record_id = len(self._hashes)
+            self._hashes.append(hash(phrase))
+            self._created.append(time.time() if created is None else created)
+            self._phrases += phrase.encode("utf-8")
+            self._phrase_offsets.append(len(self._phrases))
+            self._meanings += meaning.encode("utf-8")
+            self._meaning_offsets.append(len(self._meanings))
+            for synonym in synonyms.split(","):
+                synonym = synonym.strip()
+                if synonym:
+                    self._synonym_ids.append(self._intern(synonym))
+            self._synonym_offsets.append(len(self._synonym_ids))
+
+            self._table[slot] = record_id
+            if existing == EMPTY:
+                self._live += 1
+                if self._live * 2 > len(self._table):
+                    self._resize(len(self._table) * 2)
+            elif record_id + 1 > self._live * 2 and record_id > 1024:
+                self.compact()
+        return True
+
+    def update(self, entries):
+        # (phrase, meaning, synonyms), optionally followed by created.
+        for entry in entries:
+            self.put(*entry)
+        return self
+
+    def compact(self):
+        with self._lock:
+            live = list(self)
+            rebuilt = CompactStore(capacity=len(live))
+            for record in live:
+                rebuilt.put(*record.as_tuple())
+            self.__dict__.update({name: value for name, value in rebuilt.__dict__.items() if name != "_lock"})
+
+    def clear(self):
+        with self._lock:
+            self.__dict__.update({name: value for name, value in CompactStore().__dict__.items() if name != "_lock"})
+
+    def memory_usage(self):
+        with self._lock:
+            buffers = (self._phrases, self._meanings, self._phrase_offsets, self._meaning_offsets,
+                       self._synonym_offsets, self._synonym_ids, self._hashes, self._created, self._table)
+            vocab = sum(len(word.encode("utf-8")) + 8 for word in self._vocab)
+            return sum(len(buffer) * getattr(buffer, "itemsize", 1) for buffer in buffers) + vocab
+
+    def _intern(self, word):
+        word_id = self._vocab_ids.get(word)
+        if word_id is None:
+            word_id = len(self._vocab)
+            self._vocab.append(word)
+            self._vocab_ids[word] = word_id
+        return word_id
+
+    def _find(self, phrase):
+        # Linear probing; returns (slot, record id or EMPTY).
+        phrase_hash = hash(phrase)
+        mask = len(self._table) - 1
+        slot = phrase_hash & mask
+        while True:
+            record_id = self._table[slot]
+            if record_id == EMPTY:
+                return slot, EMPTY
+            if self._hashes[record_id] == phrase_hash and self._phrase(record_id) == phrase:
+                return slot, record_id
+            slot = (slot + 1) & mask
+
+    def _resize(self, size):
+        table = array("i", [EMPTY]) * size
+        mask = size - 1
+        for record_id in self._table:
+            if record_id == EMPTY:
+                continue
+            slot = self._hashes[record_id] & mask
+            while table[slot] != EMPTY:
+                slot = (slot + 1) & mask
+            table[slot] = record_id
+        self._table = table
+
+    def _phrase(self, record_id):
+        return self._phrases[self._phrase_offsets[record_id]:self._phrase_offsets[record_id + 1]].decode("utf-8")
+
+    def _meaning(self, record_id):
+        return self._meanings[self._meaning_offsets[record_id]:self._meaning_offsets[record_id + 1]].decode("utf-8")
+
+    def _synonyms(self, record_id):
+        ids = self._synonym_ids[self._synonym_offsets[record_id]:self._synonym_offsets[record_id + 1]]
+        return ", ".join(self._vocab[word_id] for word_id in ids)
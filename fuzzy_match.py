@@ -0,0 +1,318 @@
+import bisect
+import threading
+from array import array
+
+# Maps an inflected or misspelled copy ("runs", "runing") onto a headword we
+# already have an answer for, so it can be served from the cache or the local
+# dictionary instead of costing a Gemini call. Inflections are undone with a
+# few suffix rules checked against the known words; typos go through a
+# SymSpell-style index of single-character deletions, whose candidates are
+# then confirmed with a bounded edit distance. Only a copy that the word
+# lists (the local dictionary, the word frequency table) show is not a real
+# word is matched: "compliment" or "united" may have nothing to do with a
+# known "complement" or "unit".
+
+def lemma_candidates(word):
+    # Every stem a regular inflection could have come from, for telling
+    # whether a word is a form of a listed one ("louder", "quickly").
+    candidates = []
+
+    def add(stem, *endings):
+        if len(stem) >= 2:
+            for ending in endings:
+                candidates.append(stem + ending)
+            if len(stem) >= 3 and stem[-1] == stem[-2] and stem[-1] not in "aeiouls":
+                candidates.append(stem[:-1])
+
+    if word.endswith("ies") or word.endswith("ied"):
+        add(word[:-3], "y")
+    if word.endswith("iest"):
+        add(word[:-4], "y")
+    if word.endswith("ier") or word.endswith("ily"):
+        add(word[:-3], "y")
+    if word.endswith("ing"):
+        add(word[:-3], "", "e")
+    if word.endswith("ed"):
+        add(word[:-2], "", "e")
+    if word.endswith("est"):
+        add(word[:-3], "", "e")
+    if word.endswith("er"):
+        add(word[:-2], "", "e")
+    if word.endswith("es"):
+        add(word[:-2], "")
+    if word.endswith("s") and not word.endswith("ss"):
+        add(word[:-1], "")
+    if word.endswith("ly"):
+        add(word[:-2], "")
+    return candidates
+
+def lemma_groups(word):
+    # The stems a plural or verb form of an unlisted word can be matched back
+    # to, one group per suffix. The readings in a group are alternatives
+    # ("staring": star, stare), so a group only gives a match when exactly
+    # one of them is a word. Stems are at least 4 letters, and -er, -est and
+    # -ly aren't undone: comparatives and adverbs are of listed words, which
+    # makes the copy a listed form too.
+    groups = []
+
+    def add(*stems):
+        stems = tuple(stem for stem in stems if len(stem) >= 4)
+        if stems:
+            groups.append(stems)
+
+    if word.endswith("ies") or word.endswith("ied"):
+        add(word[:-3] + "y")
+    for suffix in ("ing", "ed"):
+        if word.endswith(suffix):
+            stem = word[:-len(suffix)]
+            if len(stem) >= 3 and stem[-1] == stem[-2] and stem[-1] not in "aeiouls":
+                add(stem, stem + "e", stem[:-1])
+            else:
+                add(stem, stem + "e")
+    if word.endswith("es"):
+        add(word[:-1], word[:-2])
+    elif word.endswith("s") and not word.endswith("ss"):
+        add(word[:-1])
+    return groups
+
+def edit_distance(a, b, limit):
+    # Optimal string alignment distance, giving up as soon as it exceeds limit.
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    # A typo leaves most of the word intact, so trim the shared ends first
+    # and run the table only over the part that differs.
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < len(a) - start and end < len(b) - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a = a[start:len(a) - end]
+    b = b[start:len(b) - end]
+    if not a or not b:
+        return len(a) + len(b)
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        best = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous2 is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+            best = min(best, value)
+        if best > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+def deletes(word, distance, prefix_length):
+    word = word[:prefix_length]
+    found = {word}
+    frontier = [word]
+    for _ in range(distance):
+        next_frontier = []
+        for item in frontier:
+            if len(item) <= 1:
+                continue
+            for i in range(len(item)):
+                variant = item[:i] + item[i + 1:]
+                if variant not in found:
+                    found.add(variant)
+                    next_frontier.append(variant)
+        frontier = next_frontier
+    return found
+
+def variant_hash(variant):
+    return hash(variant) & 0xFFFFFFFF
+
+class WordMatcher:
+    # Only single words are indexed. Edits are allowed in proportion to word
+    # length, so short real words ("angle", "bat") are not "corrected" into
+    # other real words.
+    #
+    # The deletion index is one sorted array of 64-bit entries, the 32-bit
+    # hash of a deletion variant above the id of the word it came from,
+    # searched with bisect inside the range a 64k-slot directory on the top
+    # 16 hash bits points at; a dict of variant strings takes several times the
+    # memory for a 100k word dictionary. Hash collisions only add candidates,
+    # which the edit distance check then rejects. Words added after the last
+    # rebuild sit in a small dict until the next one.
+    #
+    # Nothing is matched until a word list has been added with add_lexicon.
+    def __init__(self, max_distance=2, prefix_length=7, min_length=6, rebuild_every=1024, lexicon=()):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.min_length = min_length
+        self.rebuild_every = rebuild_every
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        self._words = []
+        self._ids = {}
+        self._index = (array("Q"), array("I", [0]) * 65537, {})
+        self._indexed = 0
+        self._sorted = []
+        self._sorted_dirty = False
+        self.lexicon = tuple(lexicon)
+
+    def add_lexicon(self, words):
+        self.lexicon += (words,)
+
+    def is_word(self, word):
+        return any(word in words for words in self.lexicon)
+
+    def is_listed(self, word):
+        # In a word list, or a regular inflection of a listed word.
+        return self.is_word(word) or any(self.is_word(stem) for stem in lemma_candidates(word))
+
+    def __len__(self):
+        return len(self._words)
+
+    def __contains__(self, word):
+        return word.lower() in self._ids
+
+    def add(self, word):
+        if not self._add(word, pending=True):
+            return False
+        if len(self._words) - self._indexed >= max(self.rebuild_every, self._indexed // 4):
+            self._rebuild()
+        return True
+
+    def update(self, words):
+        for word in words:
+            self._add(word)
+        self._rebuild()
+        return self
+
+    def _add(self, word, pending=False):
+        word = word.strip()
+        key = word.lower()
+        if not key.isalpha():
+            return False
+        with self._lock:
+            if key in self._ids:
+                return False
+            word_id = len(self._words)
+            self._words.append(word)
+            self._ids[key] = word_id
+            if pending:
+                for variant in deletes(key, self.max_distance, self.prefix_length):
+                    self._index[2].setdefault(variant_hash(variant), []).append(word_id)
+            self._sorted_dirty = True
+        return True
+
+    def _rebuild(self):
+        # Built outside the main lock so lookups and adds carry on meanwhile.
+        # Bucketed by the top byte and sorted one bucket at a time, so the
+        # temporary list of Python ints stays small.
+        with self._rebuild_lock:
+            with self._lock:
+                words = list(self._words)
+            if len(words) > self._indexed:
+                self._swap_index(words, self._build_index(words))
+
+    def _build_index(self, words):
+        buckets = [array("Q") for _ in range(256)]
+        for word_id, word in enumerate(words):
+            for variant in deletes(word.lower(), self.max_distance, self.prefix_length):
+                entry = (variant_hash(variant) << 32) | word_id
+                buckets[entry >> 56].append(entry)
+        entries = array("Q")
+        for i, bucket in enumerate(buckets):
+            entries.extend(sorted(bucket))
+            buckets[i] = None
+        directory = array("I", (bisect.bisect_left(entries, top << 48) for top in range(65537)))
+        return entries, directory
+
+    def _swap_index(self, words, index):
+        # Swapped in as one tuple so lookups never see a half-built index.
+        # Words added while it was being built stay pending.
+        with self._lock:
+            pending = {}
+            for key, ids in self._index[2].items():
+                late = [word_id for word_id in ids if word_id >= len(words)]
+                if late:
+                    pending[key] = late
+            self._index = index + (pending,)
+            self._indexed = len(words)
+
+    def _candidates(self, variant):
+        key = variant_hash(variant)
+        entries, directory, pending = self._index
+        top = key >> 16
+        i = bisect.bisect_left(entries, key << 32, directory[top], directory[top + 1])
+        while i < len(entries) and entries[i] >> 32 == key:
+            yield entries[i] & 0xFFFFFFFF
+            i += 1
+        yield from pending.get(key, ())
+
+    def memory_usage(self):
+        entries, directory, pending = self._index
+        return (len(entries) * entries.itemsize + len(directory) * directory.itemsize
+                + sum(len(ids) * 8 + 64 for ids in pending.values()))
+
+    def allowed_distance(self, word):
+        if len(word) < self.min_length:
+            return 0
+        return 1 if len(word) < 8 else self.max_distance
+
+    def lemma(self, word):
+        for stems in lemma_groups(word.lower()):
+            known = [stem for stem in stems if stem in self._ids]
+            if len(known) == 1 and not any(self.is_word(stem) for stem in stems if stem != known[0]):
+                return self._words[self._ids[known[0]]]
+        return None
+
+    def suggest(self, word, limit=3):
+        key = word.lower()
+        distance = min(self.allowed_distance(key), self.max_distance)
+        if distance == 0:
+            return []
+        seen = set()
+        found = []
+        for variant in deletes(key, distance, self.prefix_length):
+            for word_id in self._candidates(variant):
+                if word_id in seen:
+                    continue
+                seen.add(word_id)
+                candidate = self._words[word_id].lower()
+                if candidate == key:
+                    continue
+                d = edit_distance(key, candidate, distance)
+                if d <= distance:
+                    found.append((d, abs(len(candidate) - len(key)), candidate, word_id))
+        found.sort()
+        return [(self._words[word_id], d) for d, _, _, word_id in found[:limit]]
+
+    def match(self, word):
+        # Best known headword for `word`, or None. Exact first, then an
+        # inflection of a known word, then the closest spelling.
+        key = word.lower()
+        word_id = self._ids.get(key)
+        if word_id is not None:
+            return self._words[word_id]
+        if not self.lexicon or self.is_listed(key):
+            return None
+        lemma = self.lemma(key)
+        if lemma:
+            return lemma
+        suggestions = self.suggest(key, limit=1)
+        return suggestions[0][0] if suggestions else None
+
+    def prefix(self, prefix, limit=10):
+        with self._lock:
+            if self._sorted_dirty:
+                self._sorted = sorted(self._ids)
+                self._sorted_dirty = False
+            words = self._sorted
+        prefix = prefix.lower()
+        start = bisect.bisect_left(words, prefix)
+        results = []
+        for key in words[start:start + limit]:
+            if not key.startswith(prefix):
+                break
+            results.append(self._words[self._ids[key]])
+        return results
@@ -0,0 +1,165 @@
+import json
+import logging
+import threading
+import time
+
+from instrumentation import metrics
+from rate_limiter import parse_retry_after
+
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+DEFAULT_MODEL = "gemini-2.0-flash-lite"
+
+def parse_answer_text(answer):
+    meaning = ""
+    synonyms = ""
+    for line in answer.split("\n"):
+        if line.lower().startswith("meaning:"):
+            meaning = line.split(":", 1)[1].strip()
+        elif line.lower().startswith("synonyms:"):
+            synonyms = line.split(":", 1)[1].strip()
+    return meaning, synonyms
+
+def _install_connect_timing(adapter):
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    def timed(connection_class):
+        class TimedConnection(connection_class):
+            def connect(self):
+                start = time.perf_counter()
+                super().connect()
+                metrics.observe("http_connect", time.perf_counter() - start)
+        return TimedConnection
+
+    class TimedHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = timed(HTTPConnection)
+
+    class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = timed(HTTPSConnection)
+
+    adapter.poolmanager.pool_classes_by_scheme = {
+        "http": TimedHTTPConnectionPool,
+        "https": TimedHTTPSConnectionPool
+    }
+
+class GeminiClient:
+    def __init__(self, api_key=None, model=DEFAULT_MODEL, base_url=GEMINI_BASE_URL,
+                 connect_timeout=3.05, read_timeout=20, retries=2, backoff_factor=0.3,
+                 pool_size=8, limiter=None, throttle_retries=1):
+        # requests is imported here rather than at module level so importing
+        # this module stays cheap during application startup.
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        self.api_key = api_key
+        self.limiter = limiter
+        self.throttle_retries = throttle_retries
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+
+        # generateContent has no side effects, so POST is safe to retry here.
+        # 429 is left alone on purpose (including Retry-After handling, which
+        # urllib3 would otherwise apply to it): the rate limiter deals with it.
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(["GET", "HEAD", "POST"]),
+            raise_on_status=False,
+            respect_retry_after_header=False
+        )
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=retry)
+        _install_connect_timing(adapter)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Content-Type": "application/json"})
+
+    def url(self, method="generateContent", model=None):
+        return f"{self.base_url}/models/{model or self.model}:{method}"
+
+    def post(self, method, body, api_key=None, model=None, **kwargs):
+        key = api_key or self.api_key
+        if not key:
+            raise ValueError("No Gemini API key configured")
+        kwargs.setdefault("timeout", self.timeout)
+        limiter = self.limiter
+        attempts = self.throttle_retries + 1 if limiter else 1
+
+        for attempt in range(attempts):
+            if limiter:
+                limiter.acquire()
+            response = self.session.post(
+                self.url(method, model),
+                headers={"x-goog-api-key": key},
+                json=body,
+                **kwargs
+            )
+            metrics.observe("http_ttfb", response.elapsed.total_seconds(), method=method)
+            metrics.incr("http_responses", method=method, status=response.status_code)
+            if limiter and response.status_code == 429:
+                # The limiter pauses every caller for Retry-After; the next
+                # acquire() waits that out or gives up after its max wait.
+                limiter.on_throttled(parse_retry_after(response.headers.get("Retry-After")))
+                if attempt + 1 < attempts:
+                    response.close()
+                    continue
+            elif limiter and response.ok:
+                limiter.on_success()
+            break
+
+        response.raise_for_status()
+        return response
+
+    def generate_content(self, prompt, api_key=None, model=None, generation_config=None):
+        body = {"contents": [{"parts": [{"text": prompt}]}]}
+        if generation_config:
+            body["generationConfig"] = generation_config
+        with metrics.timer("http_total", method="generateContent"):
+            return self.post("generateContent", body, api_key=api_key, model=model).json()
+
+    def stream_generate_content(self, prompt, api_key=None, model=None, generation_config=None):
+        body = {"contents": [{"parts": [{"text": prompt}]}]}
+        if generation_config:
+            body["generationConfig"] = generation_config
+        start = time.perf_counter()
+        response = self.post("streamGenerateContent", body, api_key=api_key, model=model,
+                             params={"alt": "sse"}, stream=True)
+        try:
+            for raw_line in response.iter_lines():
+                line = raw_line.decode("utf-8")
+                if not line.startswith("data:"):
+                    continue
+                payload = json.loads(line[5:])
+                candidates = payload.get("candidates") or []
+                if not candidates:
+                    continue
+                for part in candidates[0].get("content", {}).get("parts", []):
+                    if part.get("text"):
+                        yield part["text"]
+        finally:
+            response.close()
+            metrics.observe("http_total", time.perf_counter() - start, method="streamGenerateContent")
+
+    def validate_key(self, api_key):
+        self.generate_content("test", api_key=api_key)
+
+    def warm_up(self):
+        def warm():
+            try:
+                self.session.head(f"{self.base_url}/models", timeout=self.timeout)
+                logging.debug("Gemini connection warmed up")
+            except Exception as e:
+                logging.debug(f"Gemini warm-up failed: {e}")
+
+        thread = threading.Thread(target=warm, daemon=True)
+        thread.start()
+        return thread
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,110 @@
+import json
+import logging
+import re
+from collections import namedtuple
+
+from gemini_client import parse_answer_text
+
+# How one lookup is asked of Gemini and how the answer is read back.
+# "structured" sends a short prompt with a JSON response schema, a cap on
+# output tokens and a low temperature, and parses the reply straight into a
+# LookupResult: the answer is bounded in length, and a model that changes its
+# wording can't silently leave a field empty, it fails to parse instead.
+# "text" is the original free-text prompt read line by line.
+
+LookupResult = namedtuple("LookupResult", ["meaning", "synonyms"])
+
+DEFAULT_PROFILE = "structured"
+
+PARTIAL_MEANING = re.compile(r'"meaning"\s*:\s*"((?:[^"\\]|\\.)*)')
+
+class TextProfile:
+    name = "text"
+
+    def prompt(self, phrase):
+        return (
+            f"Provide a short, clear meaning and 3 synonyms for the word or phrase: \"{phrase}\".\n"
+            "Format your answer like this:\nMeaning: <meaning here>\nSynonyms: synonym1, synonym2, synonym3"
+        )
+
+    def generation_config(self):
+        return None
+
+    def batch_options(self, count):
+        return {}
+
+    def parse(self, text):
+        return LookupResult(*parse_answer_text(text.strip()))
+
+    def parse_partial(self, text):
+        return self.parse(text)
+
+class StructuredProfile:
+    def __init__(self, name="structured", max_output_tokens=96, temperature=0.1, synonym_list=True):
+        self.name = name
+        self.max_output_tokens = max_output_tokens
+        self.temperature = temperature
+        self.synonym_list = synonym_list
+        synonyms = {"type": "ARRAY", "items": {"type": "STRING"}} if synonym_list else {"type": "STRING"}
+        # meaning comes first so a streamed answer can be shown before the
+        # synonyms have arrived.
+        self.schema = {
+            "type": "OBJECT",
+            "properties": {"meaning": {"type": "STRING"}, "synonyms": synonyms},
+            "required": ["meaning", "synonyms"],
+            "propertyOrdering": ["meaning", "synonyms"]
+        }
+
+    def prompt(self, phrase):
+        return f"Define \"{phrase}\" in under 20 words, with 3 synonyms."
+
+    def _limits(self, max_output_tokens):
+        options = {}
+        if max_output_tokens:
+            options["maxOutputTokens"] = max_output_tokens
+        if self.temperature is not None:
+            options["temperature"] = self.temperature
+        return options
+
+    def generation_config(self):
+        config = {"responseMimeType": "application/json", "responseSchema": self.schema}
+        config.update(self._limits(self.max_output_tokens))
+        return config
+
+    def batch_options(self, count):
+        # Each entry also repeats its phrase.
+        return self._limits(self.max_output_tokens and count * (self.max_output_tokens + 16))
+
+    def parse(self, text):
+        try:
+            answer = json.loads(text)
+        except ValueError:
+            raise ValueError(f"Incomplete answer (limit {self.max_output_tokens} output tokens)" if self.max_output_tokens
+                             else "Answer is not valid JSON")
+        if not isinstance(answer, dict):
+            raise ValueError("Answer is not a JSON object")
+        meaning = str(answer.get("meaning") or "").strip()
+        if not meaning:
+            raise ValueError("Answer has no meaning")
+        synonyms = answer.get("synonyms") or []
+        if isinstance(synonyms, list):
+            synonyms = ", ".join(str(s).strip() for s in synonyms)
+        return LookupResult(meaning, str(synonyms).strip())
+
+    def parse_partial(self, text):
+        match = PARTIAL_MEANING.search(text)
+        if not match:
+            return None
+        try:
+            return LookupResult(json.loads(f'"{match.group(1)}"').strip(), "")
+        except ValueError:
+            return None
+
+PROFILES = {profile.name: profile for profile in (TextProfile(), StructuredProfile())}
+
+def get_profile(name=None):
+    profile = PROFILES.get((name or DEFAULT_PROFILE).lower())
+    if profile is None:
+        logging.warning(f"Unknown generation profile {name!r}, using {DEFAULT_PROFILE}")
+        profile = PROFILES[DEFAULT_PROFILE]
+    return profile
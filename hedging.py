@@ -0,0 +1,224 @@
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from gemini_client import GEMINI_BASE_URL, GeminiClient
+from instrumentation import Histogram, metrics
+
+# Hedged requests over a list of Gemini backends (a model at an endpoint).
+# Every request goes to the primary first. If it hasn't answered within
+# hedge_factor times the primary's observed median for that kind of request,
+# the same request goes to the next backend and whichever answers first wins.
+# Ordinary jitter stays under that, so the budget is kept for the slow tail. A streamed loser has its
+# connection closed at once; a full-response loser can't be interrupted by
+# requests, so its answer is dropped when it arrives. Hedges are paid for
+# from a budget that grows by max_hedge_ratio per request, so a primary that
+# is slow across the board costs at most that share of extra requests.
+# A backend that can't be reached, times out or has a server error hands the
+# request straight to the next one. Attempts run on the executor's threads
+# under the caller's rate limiter priority.
+# HedgedClient has GeminiClient's interface, so LookupService takes either.
+
+class Backend:
+    def __init__(self, name, client):
+        self.name = name
+        self.client = client
+        self.latency = {"generateContent": Histogram(), "streamGenerateContent": Histogram()}
+        self.wins = 0
+        self.errors = 0
+
+    def observe(self, method, seconds):
+        self.latency[method].observe(seconds)
+        metrics.observe("backend_latency", seconds, backend=self.name, method=method)
+
+def is_transient(error):
+    # Rate limits, quota and other client errors would fail the same way on
+    # the next backend, and every retry costs a quota token.
+    import requests
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    response = getattr(error, "response", None)
+    return isinstance(error, requests.HTTPError) and response is not None and response.status_code >= 500
+
+def parse_backends(spec, **client_options):
+    # "model[@base_url],model[@base_url],...", primary first.
+    backends = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        model, _, base_url = item.partition("@")
+        backends.append(Backend(item, GeminiClient(model=model, base_url=base_url or GEMINI_BASE_URL,
+                                                   **client_options)))
+    return backends
+
+class HedgedClient:
+    def __init__(self, backends, hedge_after=1.5, hedge_factor=2.0, min_delay=0.05, min_samples=20,
+                 max_hedge_ratio=0.15, hedge_burst=3, workers=8):
+        if not backends:
+            raise ValueError("No backends configured")
+        self.backends = list(backends)
+        self.hedge_after = hedge_after
+        self.hedge_factor = hedge_factor
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.max_hedge_ratio = max_hedge_ratio
+        self.hedge_burst = hedge_burst
+        self.requests = 0
+        self.hedges = 0
+        self.hedges_denied = 0
+        self._budget = float(hedge_burst)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers * len(self.backends),
+                                            thread_name_prefix="hedged-request")
+
+    @property
+    def primary(self):
+        return self.backends[0].client
+
+    @property
+    def api_key(self):
+        return self.primary.api_key
+
+    @api_key.setter
+    def api_key(self, value):
+        for backend in self.backends:
+            backend.client.api_key = value
+
+    @property
+    def limiter(self):
+        return self.primary.limiter
+
+    @limiter.setter
+    def limiter(self, value):
+        # One key, one quota: hedged requests are counted with the rest.
+        for backend in self.backends:
+            backend.client.limiter = value
+
+    def hedge_delay(self, method):
+        histogram = self.backends[0].latency[method]
+        if histogram.count < self.min_samples:
+            return self.hedge_after
+        return max(self.min_delay, self.hedge_factor * histogram.percentiles(0.5)[0])
+
+    def _take_budget(self):
+        with self._lock:
+            if self._budget >= 1:
+                self._budget -= 1
+                self.hedges += 1
+                return True
+            self.hedges_denied += 1
+            return False
+
+    def _timed(self, backend, method, attempt, priority):
+        start = time.perf_counter()
+        try:
+            if priority is None:
+                value = attempt(backend.client)
+            else:
+                with backend.client.limiter.priority(priority):
+                    value = attempt(backend.client)
+        except Exception:
+            with self._lock:
+                backend.errors += 1
+            metrics.incr("backend_errors", backend=backend.name)
+            raise
+        backend.observe(method, time.perf_counter() - start)
+        return value
+
+    def _race(self, method, attempt, discard=None):
+        with self._lock:
+            self.requests += 1
+            self._budget = min(self.hedge_burst, self._budget + self.max_hedge_ratio)
+        # The limiter's priority is per thread, so it's carried over to the
+        # threads the attempts run on.
+        priority = self.limiter.current_priority() if self.limiter else None
+        pending = {}
+        waiting = list(self.backends)
+
+        def launch():
+            backend = waiting.pop(0)
+            pending[self._executor.submit(self._timed, backend, method, attempt, priority)] = backend
+
+        launch()
+        deadline = time.monotonic() + self.hedge_delay(method) if waiting else None
+        error = None
+        while pending:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                deadline = None
+                if self._take_budget():
+                    logging.debug(f"Hedging {method} to {waiting[0].name}")
+                    metrics.incr("hedged_requests", backend=waiting[0].name)
+                    launch()
+                continue
+            for future in done:
+                backend = pending.pop(future)
+                try:
+                    value = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                with self._lock:
+                    backend.wins += 1
+                metrics.incr("backend_wins", backend=backend.name)
+                self._cancel(pending, discard)
+                return value
+            if not pending and waiting and is_transient(error):
+                logging.warning(f"{method} failed ({str(error)}), trying {waiting[0].name}")
+                launch()
+                deadline = None
+        raise error
+
+    def _cancel(self, pending, discard):
+        for future, backend in pending.items():
+            metrics.incr("hedge_cancelled", backend=backend.name)
+            if not future.cancel() and discard:
+                future.add_done_callback(lambda f: f.exception() is None and discard(f.result()))
+
+    def generate_content(self, prompt, api_key=None, model=None, generation_config=None):
+        return self._race("generateContent", lambda client: client.generate_content(
+            prompt, api_key=api_key, model=model, generation_config=generation_config))
+
+    def stream_generate_content(self, prompt, api_key=None, model=None, generation_config=None):
+        # The race is to the first chunk; the rest is read from the winner.
+        def first_chunk(client):
+            stream = client.stream_generate_content(prompt, api_key=api_key, model=model,
+                                                    generation_config=generation_config)
+            try:
+                return stream, next(stream, None)
+            except Exception:
+                stream.close()
+                raise
+
+        stream, first = self._race("streamGenerateContent", first_chunk, discard=lambda result: result[0].close())
+        try:
+            if first is not None:
+                yield first
+                yield from stream
+        finally:
+            stream.close()
+
+    def validate_key(self, api_key):
+        self.primary.validate_key(api_key)
+
+    def warm_up(self):
+        return [backend.client.warm_up() for backend in self.backends]
+
+    def stats(self):
+        with self._lock:
+            stats = {"requests": self.requests, "hedges": self.hedges, "hedges_denied": self.hedges_denied}
+            backends = [(backend, backend.wins, backend.errors) for backend in self.backends]
+        for backend, wins, errors in backends:
+            p50, p90 = backend.latency["streamGenerateContent"].percentiles(0.5, 0.9)
+            if not backend.latency["streamGenerateContent"].count:
+                p50, p90 = backend.latency["generateContent"].percentiles(0.5, 0.9)
+            stats[backend.name] = f"wins {wins}, errors {errors}, p50 {p50 * 1000:.0f} ms, p90 {p90 * 1000:.0f} ms"
+        return stats
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for backend in self.backends:
+            backend.client.close()
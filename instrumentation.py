@@ -0,0 +1,184 @@
+import bisect
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Latency buckets in seconds, from sub-millisecond cache hits up to slow
+# Gemini responses.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _label_key(labels):
+    return tuple(sorted(labels.items())) if labels else ()
+
+def _format_labels(key, extra=None):
+    items = list(key) + (list(extra.items()) if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in items) + "}"
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS, window=512):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.total += value
+            self.count += 1
+            self.recent.append(value)
+
+    def percentiles(self, *fractions):
+        with self._lock:
+            ordered = sorted(self.recent)
+        if not ordered:
+            return [0.0 for _ in fractions]
+        return [ordered[min(len(ordered) - 1, int(len(ordered) * f))] for f in fractions]
+
+class Metrics:
+    def __init__(self, prefix="wordlookup"):
+        self.prefix = prefix
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    def incr(self, name, amount=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, seconds, **labels):
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram())
+        histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def counter_value(self, name, **labels):
+        with self._lock:
+            return self._counters.get((name, _label_key(labels)), 0)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render_prometheus(self):
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items(), key=lambda item: item[0])
+
+        lines = []
+        seen = set()
+        for (name, key), value in counters:
+            metric = f"{self.prefix}_{name}_total"
+            if metric not in seen:
+                lines.append(f"# TYPE {metric} counter")
+                seen.add(metric)
+            lines.append(f"{metric}{_format_labels(key)} {value}")
+
+        for (name, key), histogram in histograms:
+            metric = f"{self.prefix}_{name}_seconds"
+            if metric not in seen:
+                lines.append(f"# TYPE {metric} histogram")
+                seen.add(metric)
+            with histogram._lock:
+                counts = list(histogram.counts)
+                total = histogram.total
+                count = histogram.count
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{metric}_bucket{_format_labels(key, {'le': bound})} {cumulative}")
+            lines.append(f"{metric}_bucket{_format_labels(key, {'le': '+Inf'})} {count}")
+            lines.append(f"{metric}_sum{_format_labels(key)} {total}")
+            lines.append(f"{metric}_count{_format_labels(key)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items(), key=lambda item: item[0])
+
+        lines = ["Stage timings (ms)       count     p50     p95     p99"]
+        for (name, key), histogram in histograms:
+            p50, p95, p99 = histogram.percentiles(0.5, 0.95, 0.99)
+            label = name + "".join(f" {label_value}" for _, label_value in key)
+            lines.append(f"{label[:22]:<22} {histogram.count:7d} {p50 * 1000:7.1f} "
+                         f"{p95 * 1000:7.1f} {p99 * 1000:7.1f}")
+        lines.append("")
+        lines.append("Counters")
+        for (name, key), value in counters:
+            label = name + "".join(f" {label_value}" for _, label_value in key)
+            lines.append(f"{label[:30]:<30} {value:9d}")
+        return "\n".join(lines)
+
+    def dump(self, path):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp_path, path)
+
+metrics = Metrics()
+
+def start_metrics_server(port, registry=None, host="127.0.0.1"):
+    registry = registry or metrics
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    logging.info(f"Metrics available at http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+def start_metrics_dump(path, interval=60, registry=None):
+    registry = registry or metrics
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval):
+            try:
+                registry.dump(path)
+            except Exception as e:
+                logging.warning(f"Failed to write metrics file: {str(e)}")
+
+    threading.Thread(target=run, name="metrics-dump", daemon=True).start()
+    return stop
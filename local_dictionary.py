@@ -0,0 +1,155 @@
+import argparse
+import logging
+import mmap
+import os
+import struct
+import sys
+
+# File layout, all little-endian:
+#   header   magic, version, flags, entry count, offsets of the three sections
+#   index    one (key offset, key length, data offset, data length) per entry,
+#            sorted by key so lookups are a binary search over the mapped file
+#   keys     concatenated UTF-8 headwords (lower-cased)
+#   data     concatenated UTF-8 "meaning\x1fsynonyms" records
+MAGIC = b"WLDX"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIQQQ")
+ENTRY = struct.Struct("<IIII")
+FIELD_SEP = "\x1f"
+
+def normalize_headword(word):
+    return " ".join(word.split()).lower()
+
+def build_index(entries, path):
+    records = {}
+    for word, meaning, synonyms in entries:
+        key = normalize_headword(word)
+        if key and meaning:
+            records[key.encode("utf-8")] = f"{meaning}{FIELD_SEP}{synonyms}".encode("utf-8")
+
+    keys = sorted(records)
+    index = bytearray()
+    key_blob = bytearray()
+    data_blob = bytearray()
+    for key in keys:
+        data = records[key]
+        index += ENTRY.pack(len(key_blob), len(key), len(data_blob), len(data))
+        key_blob += key
+        data_blob += data
+
+    index_offset = HEADER.size
+    keys_offset = index_offset + len(index)
+    data_offset = keys_offset + len(key_blob)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(keys), index_offset, keys_offset, data_offset))
+        f.write(index)
+        f.write(key_blob)
+        f.write(data_blob)
+    os.replace(tmp_path, path)
+    return len(keys)
+
+def read_tsv(path):
+    handle = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    try:
+        for line in handle:
+            parts = line.rstrip("\n").split("\t")
+            if len(parts) >= 2 and not line.startswith("#"):
+                yield parts[0], parts[1], parts[2] if len(parts) > 2 else ""
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+class LocalDictionary:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, _, count, index_offset, keys_offset, data_offset = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a version {VERSION} dictionary index")
+        except Exception:
+            self._file.close()
+            raise
+        self.count = count
+        self._index_offset = index_offset
+        self._keys_offset = keys_offset
+        self._data_offset = data_offset
+
+    def __len__(self):
+        return self.count
+
+    def _key_at(self, i):
+        key_off, key_len, _, _ = ENTRY.unpack_from(self._map, self._index_offset + i * ENTRY.size)
+        start = self._keys_offset + key_off
+        return self._map[start:start + key_len]
+
+    def _find(self, key):
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self._key_at(lo) == key:
+            return lo
+        return -1
+
+    def get(self, phrase):
+        i = self._find(normalize_headword(phrase).encode("utf-8"))
+        if i < 0:
+            return None
+        _, _, data_off, data_len = ENTRY.unpack_from(self._map, self._index_offset + i * ENTRY.size)
+        start = self._data_offset + data_off
+        meaning, _, synonyms = self._map[start:start + data_len].decode("utf-8").partition(FIELD_SEP)
+        return meaning, synonyms
+
+    def __contains__(self, phrase):
+        return self._find(normalize_headword(phrase).encode("utf-8")) >= 0
+
+    def headwords(self):
+        for i in range(self.count):
+            yield self._key_at(i).decode("utf-8")
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+def open_local_dictionary(paths):
+    for path in paths:
+        if path and os.path.exists(path):
+            try:
+                dictionary = LocalDictionary(path)
+                logging.info(f"Loaded local dictionary with {len(dictionary)} entries from {path}")
+                return dictionary
+            except Exception as e:
+                logging.error(f"Failed to load local dictionary {path}: {str(e)}")
+    return None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query a Word Lookup dictionary index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="compile a TSV word list (word<TAB>meaning<TAB>synonyms)")
+    build.add_argument("source", help="TSV file, or - for stdin")
+    build.add_argument("output")
+    query = sub.add_parser("lookup", help="look a word up in an index")
+    query.add_argument("index")
+    query.add_argument("word")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        count = build_index(read_tsv(args.source), args.output)
+        print(f"Wrote {count} entries to {args.output}")
+    else:
+        dictionary = LocalDictionary(args.index)
+        result = dictionary.get(args.word)
+        if result is None:
+            print(f"{args.word}: not found")
+            return 1
+        print(f"{args.word}:\nMeaning: {result[0]}\nSynonyms: {result[1]}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+import atexit
+import gzip
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import shutil
+
+# Callers only put records on a queue; formatting, redaction and the file and
+# console writes all happen on one listener thread. Records that arrive
+# together are written together and flushed once, and the log file rolls over
+# to gzip-compressed backups when it reaches max_bytes.
+
+REDACT_PATTERN = re.compile(r'GEMINI_API_KEY=[^\s]*|api_key=[^\s]*|key=[^\s]*')
+
+class RedactingFormatter(logging.Formatter):
+    def format(self, record):
+        message = super().format(record)
+        if "=" not in message:
+            return message
+        return REDACT_PATTERN.sub('[REDACTED]', message)
+
+class BatchingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    # Flushed by the listener once per batch rather than once per record.
+    def __init__(self, filename, max_bytes=5 * 1024 * 1024, backup_count=3):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+        self.namer = lambda name: f"{name}.gz"
+        self.rotator = compress_log
+
+    def flush(self):
+        pass
+
+    def flush_batch(self):
+        super().flush()
+
+def compress_log(source, dest):
+    with open(source, "rb") as f_in, gzip.open(dest, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    # A full queue means the disk has stalled; drop the record rather than
+    # block or raise on the calling thread.
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Only what the listener cannot do later is done here: merging args
+        # and rendering a traceback. The stock prepare() also formats and
+        # copies every record on the calling thread.
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+    def handle(self, record):
+        super().handle(record)
+        if self.queue.empty():
+            for handler in self.handlers:
+                flush = getattr(handler, "flush_batch", handler.flush)
+                flush()
+
+class LogPipeline:
+    def __init__(self, handlers, level=logging.INFO, max_queue=10000):
+        self.queue = queue.Queue(max_queue)
+        self.handler = DroppingQueueHandler(self.queue)
+        self.handlers = handlers
+        self.listener = BatchingQueueListener(self.queue, *handlers, respect_handler_level=True)
+        self.level = level
+        self.running = False
+
+    def start(self):
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(self.handler)
+        root.setLevel(self.level)
+        self.listener.start()
+        self.running = True
+        atexit.register(self.stop)
+
+    def set_level(self, level):
+        # The root level is checked before a record is built, so anything
+        # below it costs one integer compare on the calling thread.
+        self.level = level
+        logging.getLogger().setLevel(level)
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        self.listener.stop()
+        for handler in self.handlers:
+            getattr(handler, "flush_batch", handler.flush)()
+
+def start_log_pipeline(log_file, level=logging.INFO, max_bytes=5 * 1024 * 1024, backup_count=3, stream=None):
+    formatter = RedactingFormatter('%(asctime)s - %(levelname)s - %(message)s')
+    handlers = []
+    try:
+        file_handler = BatchingRotatingFileHandler(log_file, max_bytes, backup_count)
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+    except OSError as e:
+        print(f"Cannot write log file {log_file}: {e}")
+    if stream is not None:
+        stream_handler = logging.StreamHandler(stream)
+        stream_handler.setFormatter(formatter)
+        handlers.append(stream_handler)
+
+    pipeline = LogPipeline(handlers, level)
+    pipeline.start()
+    return pipeline
@@ -0,0 +1,184 @@
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+ERROR_PREFIX = "⚠️ Error:"
+
+def is_error_result(meaning):
+    return not meaning or meaning.startswith(ERROR_PREFIX)
+
+class LookupCache:
+    # resident, a CompactStore, holds every cached entry in memory behind
+    # the small LRU, so a miss there doesn't reach SQLite either. Its hits
+    # count towards last_used and expire like the rest.
+    def __init__(self, db_path, max_entries=50000, max_age=90 * 24 * 3600,
+                 memory_size=512, evict_every=100, touch_every=64, touch_interval=60.0, resident=None):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.memory_size = memory_size
+        self.evict_every = evict_every
+        self.touch_every = touch_every
+        self.touch_interval = touch_interval
+        self.resident = resident
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._puts_since_evict = 0
+        # Hits served from memory, written to last_used in batches so the
+        # most used words don't look stale to eviction.
+        self._touched = {}
+        self._touched_since = time.monotonic()
+        self._conn = None
+
+        if db_path:
+            try:
+                self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS lookups ("
+                    "phrase TEXT PRIMARY KEY, meaning TEXT NOT NULL, synonyms TEXT NOT NULL, "
+                    "created REAL NOT NULL, last_used REAL NOT NULL)"
+                )
+                self._conn.execute("CREATE INDEX IF NOT EXISTS lookups_last_used ON lookups(last_used)")
+                self._evict()
+                if resident is not None:
+                    resident.update(self._conn.execute(
+                        "SELECT phrase, meaning, synonyms, created FROM lookups ORDER BY last_used"
+                    ))
+            except sqlite3.Error as e:
+                logging.error(f"Lookup cache unavailable, using memory only: {e}")
+                self._conn = None
+
+    def get(self, phrase):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(phrase)
+            if entry is not None:
+                meaning, synonyms, created = entry
+                if now - created <= self.max_age:
+                    self._memory.move_to_end(phrase)
+                    self._touch(phrase, now)
+                    return meaning, synonyms
+                del self._memory[phrase]
+
+            if self.resident is not None:
+                record = self.resident.record(phrase)
+                if record is not None and now - record.created <= self.max_age:
+                    self._touch(phrase, now)
+                    return record.meaning, record.synonyms
+
+            if self._conn is None:
+                return None
+            try:
+                row = self._conn.execute(
+                    "SELECT meaning, synonyms, created FROM lookups WHERE phrase = ?", (phrase,)
+                ).fetchone()
+                if row is None:
+                    return None
+                meaning, synonyms, created = row
+                if now - created > self.max_age:
+                    self._conn.execute("DELETE FROM lookups WHERE phrase = ?", (phrase,))
+                    return None
+                self._conn.execute("UPDATE lookups SET last_used = ? WHERE phrase = ?", (now, phrase))
+            except sqlite3.Error as e:
+                logging.error(f"Lookup cache read failed: {e}")
+                return None
+            self._remember(phrase, meaning, synonyms, created)
+            return meaning, synonyms
+
+    def put(self, phrase, meaning, synonyms):
+        if is_error_result(meaning):
+            return False
+        now = time.time()
+        with self._lock:
+            self._remember(phrase, meaning, synonyms, now)
+            if self.resident is not None:
+                self.resident.put(phrase, meaning, synonyms, now)
+            if self._conn is None:
+                return True
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO lookups (phrase, meaning, synonyms, created, last_used) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (phrase, meaning, synonyms, now, now)
+                )
+                self._puts_since_evict += 1
+                if self._puts_since_evict >= self.evict_every:
+                    self._evict()
+            except sqlite3.Error as e:
+                logging.error(f"Lookup cache write failed: {e}")
+        return True
+
+    def entries(self):
+        if self._conn is None:
+            with self._lock:
+                return [(phrase, meaning, synonyms) for phrase, (meaning, synonyms, _) in self._memory.items()]
+        with self._lock:
+            self._flush_touched()
+            return self._conn.execute(
+                "SELECT phrase, meaning, synonyms FROM lookups WHERE created >= ? ORDER BY last_used",
+                (time.time() - self.max_age,)
+            ).fetchall()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+            if self.resident is not None:
+                self.resident.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM lookups")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._flush_touched()
+                self._conn.close()
+                self._conn = None
+
+    def __len__(self):
+        with self._lock:
+            if self._conn is None:
+                return len(self._memory)
+            return self._conn.execute("SELECT COUNT(*) FROM lookups").fetchone()[0]
+
+    def _remember(self, phrase, meaning, synonyms, created):
+        self._memory[phrase] = (meaning, synonyms, created)
+        self._memory.move_to_end(phrase)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _touch(self, phrase, now):
+        if self._conn is None:
+            return
+        self._touched[phrase] = now
+        if (len(self._touched) >= self.touch_every
+                or time.monotonic() - self._touched_since >= self.touch_interval):
+            self._flush_touched()
+
+    def _flush_touched(self):
+        self._touched_since = time.monotonic()
+        if not self._touched:
+            return
+        touched = [(used, phrase) for phrase, used in self._touched.items()]
+        self._touched.clear()
+        try:
+            self._conn.executemany("UPDATE lookups SET last_used = ? WHERE phrase = ?", touched)
+        except sqlite3.Error as e:
+            logging.error(f"Lookup cache write failed: {e}")
+
+    def _evict(self):
+        self._puts_since_evict = 0
+        self._flush_touched()
+        self._conn.execute("DELETE FROM lookups WHERE created < ?", (time.time() - self.max_age,))
+        count = self._conn.execute("SELECT COUNT(*) FROM lookups").fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM lookups WHERE phrase IN "
+                "(SELECT phrase FROM lookups ORDER BY last_used ASC LIMIT ?)",
+                (count - self.max_entries,)
+            )
@@ -0,0 +1,234 @@
+import json
+import logging
+import re
+import threading
+
+from batching import MicroBatcher
+from generation_profile import get_profile
+from lookup_cache import is_error_result
+from instrumentation import metrics
+from resolver import TieredResolver
+from single_flight import SingleFlight
+
+# Everything needed to turn a copied phrase into (meaning, synonyms), with no
+# GUI, registry or file-system side effects at import time. main.py builds a
+# LookupService on top of its Gemini client, cache and local dictionary; the
+# benchmarks build one against a local mock server.
+
+def error_result(message):
+    return f"⚠️ Error: {message}", ""
+
+class PhraseValidator:
+    # Runs on every clipboard change, whatever was copied. Anything longer than
+    # max_chars is rejected on its length alone, before any scanning, so a
+    # copied document costs nothing. Shorter text is matched against one
+    # pattern compiled from the rules, and the last answer is remembered
+    # because the same content is often seen again by the next poll.
+    def __init__(self, max_words=3, unicode=False, hyphens=False, apostrophes=False, max_chars=None):
+        letters = r"[^\W\d_]+" if unicode else r"[A-Za-z]+"
+        joiners = ("-" if hyphens else "") + ("'\u2019" if apostrophes else "")
+        word = f"{letters}(?:[{joiners}]{letters})*" if joiners else letters
+        self.max_words = max_words
+        self.max_chars = max_chars or max_words * 40
+        self.pattern = re.compile(rf"\s*({word}(?:\s+{word}){{0,{max_words - 1}}})\s*")
+        self._last = (None, None)
+
+    def __call__(self, text):
+        if len(text) > self.max_chars:
+            return None
+        last_text, last_result = self._last
+        if text == last_text:
+            return last_result
+        match = self.pattern.fullmatch(text)
+        result = " ".join(match.group(1).split()) if match else None
+        self._last = (text, result)
+        return result
+
+is_valid_phrase = PhraseValidator()
+
+BATCH_RESPONSE_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "phrase": {"type": "STRING"},
+            "meaning": {"type": "STRING"},
+            "synonyms": {"type": "ARRAY", "items": {"type": "STRING"}}
+        },
+        "required": ["phrase", "meaning", "synonyms"]
+    }
+}
+
+def get_meaning_and_synonyms_from_gemini(client, phrase, profile=None):
+    profile = profile or get_profile()
+    logging.debug(f"Getting meaning for phrase: {phrase} ({profile.name})")
+    try:
+        with metrics.timer("gemini_lookup", profile=profile.name):
+            res_json = client.generate_content(profile.prompt(phrase), generation_config=profile.generation_config())
+        with metrics.timer("parse"):
+            return profile.parse(res_json["candidates"][0]["content"]["parts"][0]["text"])
+    except Exception as e:
+        metrics.incr("gemini_lookup_failures", profile=profile.name)
+        return error_result(str(e))
+
+def get_meaning_and_synonyms_from_gemini_stream(client, phrase, on_update=None, profile=None):
+    profile = profile or get_profile()
+    logging.debug(f"Streaming meaning for phrase: {phrase} ({profile.name})")
+    try:
+        answer = ""
+        with metrics.timer("gemini_lookup", profile=profile.name):
+            for chunk in client.stream_generate_content(profile.prompt(phrase),
+                                                        generation_config=profile.generation_config()):
+                answer += chunk
+                if on_update:
+                    partial = profile.parse_partial(answer)
+                    if partial and partial.meaning:
+                        on_update(*partial)
+        with metrics.timer("parse"):
+            return profile.parse(answer)
+    except Exception as e:
+        metrics.incr("gemini_lookup_failures", profile=profile.name)
+        return error_result(str(e))
+
+def get_meanings_and_synonyms_from_gemini(client, phrases, profile=None):
+    logging.debug(f"Getting meanings for {len(phrases)} phrases")
+    prompt_text = (
+        "For each word or phrase below, provide a short, clear meaning and 3 synonyms. "
+        "Return one entry per phrase, with the phrase exactly as given.\n"
+        + "\n".join(f"- {phrase}" for phrase in phrases)
+    )
+    generation_config = {
+        "responseMimeType": "application/json",
+        "responseSchema": BATCH_RESPONSE_SCHEMA
+    }
+    generation_config.update((profile or get_profile()).batch_options(len(phrases)))
+
+    try:
+        res_json = client.generate_content(prompt_text, generation_config=generation_config)
+        with metrics.timer("parse"):
+            answer = res_json["candidates"][0]["content"]["parts"][0]["text"]
+            entries = json.loads(answer)
+    except Exception as e:
+        return {phrase: error_result(str(e)) for phrase in phrases}
+
+    by_phrase = {}
+    for entry in entries:
+        try:
+            synonyms = entry.get("synonyms") or []
+            if isinstance(synonyms, list):
+                synonyms = ", ".join(str(s).strip() for s in synonyms)
+            by_phrase[str(entry["phrase"]).strip().lower()] = (str(entry["meaning"]).strip(), synonyms)
+        except Exception as e:
+            logging.warning(f"Skipping malformed batch entry: {str(e)}")
+
+    results = {}
+    for phrase in phrases:
+        result = by_phrase.get(phrase.lower())
+        if result is None or not result[0]:
+            result = error_result(f"No result for \"{phrase}\"")
+        results[phrase] = result
+    return results
+
+class LookupService:
+    # Remote lookups are streamed by default so the popup fills in as the
+    # answer arrives; each streamed lookup is its own request. With streaming
+    # off (WORD_LOOKUP_STREAMING=0, --bulk), lookups arriving within
+    # batch_window share one request through a MicroBatcher, which is only
+    # created, with its thread and executor, the first time it is needed.
+    def __init__(self, client, cache=None, dictionary=None, streaming=True, batch_window=0.01,
+                 matcher=None, packs=None, profile=None):
+        self.client = client
+        self.profile = profile or get_profile()
+        self.cache = cache
+        self.packs = packs
+        self.matcher = matcher
+        self.dictionary = dictionary
+        self.streaming = streaming
+        self.flight = SingleFlight()
+        self.batch_window = batch_window
+        self._batcher = None
+        self._batcher_lock = threading.Lock()
+
+        tiers = []
+        if cache is not None:
+            tiers.append(("cache", cache.get))
+        if packs is not None:
+            tiers.append(("pack", packs.get))
+        if dictionary is not None:
+            tiers.append(("local", dictionary.get))
+        self.exact_tiers = list(tiers)
+        if matcher is not None:
+            tiers.append(("fuzzy", self.match_known))
+        self.resolver = TieredResolver(tiers, self.fetch_remote, store=self.store)
+
+    def store(self, phrase, meaning, synonyms):
+        if is_error_result(meaning):
+            return
+        if self.cache is not None:
+            self.cache.put(phrase, meaning, synonyms)
+        if self.matcher is not None:
+            self.matcher.add(phrase)
+
+    def match_known(self, phrase):
+        # A single word that is an inflection or a misspelling of a word we
+        # already have an answer for is served from that answer.
+        if " " in phrase:
+            return None
+        if self.dictionary is not None and phrase in self.dictionary:
+            return None
+        known = self.matcher.match(phrase)
+        if not known or known == phrase:
+            return None
+        for _, get in self.exact_tiers:
+            result = get(known)
+            if result:
+                meaning, synonyms = result
+                if known.lower() == phrase.lower():
+                    return meaning, synonyms
+                return f"({known}) {meaning}", synonyms
+        return None
+
+    def fetch_one(self, phrase):
+        return get_meaning_and_synonyms_from_gemini(self.client, phrase, self.profile)
+
+    def fetch_stream(self, phrase, on_update=None):
+        return get_meaning_and_synonyms_from_gemini_stream(self.client, phrase, on_update, self.profile)
+
+    def fetch_batch(self, phrases):
+        return get_meanings_and_synonyms_from_gemini(self.client, phrases, self.profile)
+
+    @property
+    def batcher(self):
+        with self._batcher_lock:
+            if self._batcher is None:
+                self._batcher = MicroBatcher(self.fetch_batch, self.fetch_one, window=self.batch_window)
+            return self._batcher
+
+    def fetch_remote(self, phrase, progress=None):
+        if self.streaming:
+            return self.flight.do(phrase, self.fetch_stream, phrase, progress)
+        return self.flight.do(phrase, self.batcher.lookup, phrase)
+
+    def fetch_many(self, phrases):
+        if len(phrases) == 1:
+            return {phrases[0]: self.fetch_one(phrases[0])}
+        return self.fetch_batch(phrases)
+
+    def lookup(self, phrase, progress=None):
+        return self.resolver.resolve(phrase, progress)
+
+    def lookup_many(self, phrases, fuzzy=True):
+        # Paragraph mode: cache and local answers first, then one batched
+        # Gemini request for the rest. Returns (phrase, meaning, synonyms)
+        # in the order given. fuzzy=False leaves out answers borrowed from a
+        # similar known word.
+        results = self.resolver.resolve_many(phrases, self.fetch_many, None if fuzzy else self.exact_tiers)
+        return [(phrase,) + tuple(results[phrase]) for phrase in phrases]
+
+    def stats(self):
+        return {
+            "tier_hits": dict(self.resolver.hits),
+            "gemini_requests": self.flight.stats(),
+            "batches": self._batcher.batches if self._batcher else 0,
+            "batched_phrases": self._batcher.batched_phrases if self._batcher else 0
+        }
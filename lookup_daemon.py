@@ -0,0 +1,219 @@
+import http.client
+import json
+import logging
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from instrumentation import metrics
+from lookup_core import error_result, is_valid_phrase
+
+# Optional shared lookup service for hosts where several users each run the
+# tray app (terminal servers). One daemon owns the cache, the Gemini
+# connection pool and the rate limiter; each tray app forwards its lookups to
+# it over keep-alive HTTP on localhost instead of calling Gemini itself.
+
+DEFAULT_ADDRESS = "127.0.0.1:47601"
+TOKEN_HEADER = "X-Word-Lookup-Token"
+
+def parse_address(value):
+    host, _, port = (value or DEFAULT_ADDRESS).rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+class DaemonServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+class LookupDaemon:
+    def __init__(self, service, host="127.0.0.1", port=47601, token=None, validate=is_valid_phrase):
+        # Clients get whole answers, so a streamed one would be read to the
+        # end for nothing; unstreamed, misses from concurrent clients share
+        # micro-batched Gemini requests.
+        service.streaming = False
+        self.service = service
+        self.token = token
+        self.validate = validate
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.server = DaemonServer((host, port), self._handler_class())
+        self._thread = None
+
+    @property
+    def address(self):
+        host, port = self.server.server_address[:2]
+        return f"{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="lookup-daemon", daemon=True)
+        self._thread.start()
+        return self.address
+
+    def serve_forever(self):
+        logging.info(f"Lookup daemon listening on {self.address}")
+        self.server.serve_forever()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def stats(self):
+        stats = self.service.stats()
+        stats["daemon_requests"] = self.requests
+        return stats
+
+    def _count(self):
+        with self._lock:
+            self.requests += 1
+
+    def _handler_class(self):
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; with Nagle on, a
+            # keep-alive client waits on a delayed ACK for every answer.
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if not self._authorized():
+                    return
+                if self.path == "/health":
+                    self._send_json(200, {"ok": True})
+                elif self.path == "/stats":
+                    self._send_json(200, daemon.stats())
+                else:
+                    self._send_json(404, {"error": "not found"})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length)
+                if not self._authorized():
+                    return
+                if self.path == "/lookup_many":
+                    self._lookup_many(body)
+                    return
+                if self.path != "/lookup":
+                    self._send_json(404, {"error": "not found"})
+                    return
+                try:
+                    phrase = daemon.validate(str(json.loads(body)["phrase"]))
+                except Exception:
+                    phrase = None
+                if not phrase:
+                    self._send_json(400, {"error": "expected {\"phrase\": <1-3 words>}"})
+                    return
+
+                daemon._count()
+                with metrics.timer("daemon_lookup"):
+                    try:
+                        meaning, synonyms = daemon.service.lookup(phrase)
+                    except Exception as e:
+                        logging.error(f"Daemon lookup of '{phrase}' failed: {str(e)}")
+                        meaning, synonyms = error_result(str(e))
+                self._send_json(200, {"phrase": phrase, "meaning": meaning, "synonyms": synonyms})
+
+            def _lookup_many(self, body):
+                try:
+                    request = json.loads(body)
+                    phrases = [daemon.validate(str(phrase)) for phrase in request["phrases"]]
+                    fuzzy = bool(request.get("fuzzy", True))
+                except Exception:
+                    phrases = [None]
+                if not phrases or not all(phrases):
+                    self._send_json(400, {"error": "expected {\"phrases\": [<1-3 words>, ...]}"})
+                    return
+
+                daemon._count()
+                with metrics.timer("daemon_lookup"):
+                    try:
+                        entries = daemon.service.lookup_many(phrases, fuzzy=fuzzy)
+                    except Exception as e:
+                        logging.error(f"Daemon lookup of {len(phrases)} words failed: {str(e)}")
+                        entries = [(phrase,) + error_result(str(e)) for phrase in phrases]
+                self._send_json(200, {"entries": entries})
+
+            def _authorized(self):
+                if daemon.token and self.headers.get(TOKEN_HEADER) != daemon.token:
+                    self._send_json(403, {"error": "bad token"})
+                    return False
+                return True
+
+            def _send_json(self, status, payload):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+class LookupClient:
+    # Stands in for LookupService in the tray app. Each thread keeps its own
+    # keep-alive connection; a dropped connection is reopened once before the
+    # lookup is reported as failed. Answers arrive whole, not streamed.
+    def __init__(self, host="127.0.0.1", port=47601, token=None, timeout=30):
+        self.host = host
+        self.port = port
+        self.token = token
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _reset(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+        self._local.conn = None
+
+    def _request(self, method, path, payload=None):
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers[TOKEN_HEADER] = self.token
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = json.loads(response.read() or b"{}")
+            except (http.client.HTTPException, socket.error, ValueError):
+                self._reset()
+                if attempt:
+                    raise
+                continue
+            if response.status != 200:
+                raise RuntimeError(f"Lookup service returned {response.status}: {data.get('error')}")
+            return data
+
+    def lookup(self, phrase, progress=None):
+        try:
+            data = self._request("POST", "/lookup", {"phrase": phrase})
+            return data["meaning"], data["synonyms"]
+        except Exception as e:
+            return error_result(f"Lookup service unavailable: {str(e)}")
+
+    def lookup_many(self, phrases, fuzzy=True):
+        try:
+            data = self._request("POST", "/lookup_many", {"phrases": list(phrases), "fuzzy": fuzzy})
+            return [tuple(entry) for entry in data["entries"]]
+        except Exception as e:
+            return [(phrase,) + error_result(f"Lookup service unavailable: {str(e)}") for phrase in phrases]
+
+    def stats(self):
+        try:
+            return self._request("GET", "/stats")
+        except Exception as e:
+            return {"error": str(e)}
+
+    def close(self):
+        self._reset()
@@ -0,0 +1,157 @@
+import logging
+import queue
+import threading
+import time
+from collections import deque
+
+from instrumentation import metrics
+
+class PipelineStats:
+    def __init__(self, window=256):
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped_full = 0
+        self.dropped_stale = 0
+        self.discarded_stale = 0
+        self.max_queue_depth = 0
+        self.queue_depth = 0
+        self._wait_times = deque(maxlen=window)
+        self._service_times = deque(maxlen=window)
+
+    def record_submit(self, depth):
+        with self._lock:
+            self.submitted += 1
+            self.queue_depth = depth
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+
+    def record_done(self, wait, service):
+        metrics.observe("queue_wait", wait)
+        metrics.observe("lookup", service)
+        with self._lock:
+            self.completed += 1
+            self._wait_times.append(wait)
+            self._service_times.append(service)
+
+    def incr(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "dropped_full": self.dropped_full,
+                "dropped_stale": self.dropped_stale,
+                "discarded_stale": self.discarded_stale,
+                "queue_depth": self.queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "wait_ms": _summary(self._wait_times),
+                "service_ms": _summary(self._service_times)
+            }
+
+def _summary(samples):
+    if not samples:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0}
+    ordered = sorted(samples)
+    return {
+        "mean": sum(ordered) / len(ordered) * 1000,
+        "p50": ordered[len(ordered) // 2] * 1000,
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000
+    }
+
+class LookupPipeline:
+    # Only the newest submitted phrase may produce a result. Older requests are
+    # dropped before they start, and if they were already running (an HTTP call
+    # cannot be interrupted) their result is discarded instead of shown.
+    def __init__(self, resolve, on_result, on_progress=None, workers=2, max_queue=8):
+        self.resolve = resolve
+        self.on_result = on_result
+        self.on_progress = on_progress
+        self.workers = workers
+        self.stats = PipelineStats()
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"lookup-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        for _ in self._threads:
+            self._put((None, None, None))
+        for thread in self._threads:
+            thread.join(timeout=1)
+        self._threads = []
+
+    def submit(self, phrase):
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        self._put((generation, phrase, time.perf_counter()))
+        self.stats.record_submit(self._queue.qsize())
+        return generation
+
+    def is_stale(self, generation):
+        return generation != self._generation
+
+    def _put(self, item):
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.stats.incr("dropped_full")
+                except queue.Empty:
+                    pass
+
+    def _progress_callback(self, generation, phrase):
+        def progress(meaning, synonyms):
+            if not self.is_stale(generation):
+                self.on_progress(phrase, meaning, synonyms)
+        return progress
+
+    def _worker(self):
+        while True:
+            generation, phrase, submitted = self._queue.get()
+            if generation is None:
+                return
+
+            started = time.perf_counter()
+            if self.is_stale(generation):
+                self.stats.incr("dropped_stale")
+                continue
+
+            try:
+                if self.on_progress:
+                    meaning, synonyms = self.resolve(phrase, self._progress_callback(generation, phrase))
+                else:
+                    meaning, synonyms = self.resolve(phrase)
+            except Exception as e:
+                self.stats.incr("failed")
+                logging.error(f"Error looking up '{phrase}': {str(e)}")
+                continue
+
+            finished = time.perf_counter()
+            self.stats.record_done(started - submitted, finished - started)
+            if logging.root.isEnabledFor(logging.DEBUG):
+                logging.debug(f"Lookup '{phrase}' waited {(started - submitted) * 1000:.1f} ms, "
+                              f"service {(finished - started) * 1000:.1f} ms, queue depth {self._queue.qsize()}")
+
+            if self.is_stale(generation):
+                self.stats.incr("discarded_stale")
+                continue
+
+            try:
+                self.on_result(phrase, meaning, synonyms)
+            except Exception as e:
+                logging.error(f"Error showing result for '{phrase}': {str(e)}")
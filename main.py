@@ -1,22 +1,45 @@
-import pyperclip
 import time
-import tkinter as tk
-import tkinter.messagebox
+import sys
+from startup_profile import StartupProfile
+
+startup_profile = StartupProfile(enabled="--profile-startup" in sys.argv)
+
 import threading
 import ctypes
-import re
-import requests
 import os
+import functools
+import argparse
+import atexit
 from dotenv import load_dotenv
-import pystray
-from PIL import Image;
-import winreg
+try:
+    import winreg
+except ImportError:
+    winreg = None
 import logging
-import sys
 import base64
-from cryptography.fernet import Fernet
 import json
 from pathlib import Path
+from lookup_cache import LookupCache
+from compact_store import CompactStore
+from fuzzy_match import WordMatcher
+from gemini_client import GeminiClient
+from generation_profile import get_profile
+from hedging import HedgedClient, parse_backends
+from bulk_lookup import BulkLookup, read_words
+from cache_pack import find_pack_paths, open_cache_packs
+from clipboard_watch import create_clipboard_source
+from lookup_pipeline import LookupPipeline
+from local_dictionary import open_local_dictionary
+from log_pipeline import start_log_pipeline
+from lookup_core import LookupService, PhraseValidator, is_valid_phrase
+from lookup_daemon import LookupClient, LookupDaemon, parse_address
+from instrumentation import metrics, start_metrics_dump, start_metrics_server
+from paragraph import format_entries, open_frequency_filter
+from prefetch import Prefetcher
+from rate_limiter import RateLimiter
+from secure_config import SecureConfig
+
+startup_profile.mark("import modules")
 
 def is_admin():
     try:
@@ -59,86 +82,76 @@ def run_as_admin():
             return False
     return True
 
+@functools.lru_cache(maxsize=None)
 def get_app_data_dir():
-    app_data = os.path.join(os.getenv('APPDATA'), 'Word Lookup')
+    # Outside Windows (headless --bulk runs) APPDATA is unset; use the XDG
+    # user data directory instead.
+    base = os.getenv('APPDATA') or os.getenv('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+    app_data = os.path.join(base, 'Word Lookup')
     os.makedirs(app_data, exist_ok=True)
     return app_data
 
-def get_encryption_key():
-    key_file = os.path.join(get_app_data_dir(), '.key')
-    if os.path.exists(key_file):
-        with open(key_file, 'rb') as f:
-            return f.read()
-    else:
-        key = Fernet.generate_key()
-        with open(key_file, 'wb') as f:
-            f.write(key)
-        return key
-
-def encrypt_api_key(api_key):
-    f = Fernet(get_encryption_key())
-    return f.encrypt(api_key.encode()).decode()
+secure_config = None
+secure_config_lock = threading.Lock()
 
-def decrypt_api_key(encrypted_key):
-    try:
-        f = Fernet(get_encryption_key())
-        return f.decrypt(encrypted_key.encode()).decode()
-    except:
-        return None
+def get_secure_config():
+    global secure_config
+    with secure_config_lock:
+        if secure_config is None:
+            secure_config = SecureConfig(get_app_data_dir())
+    return secure_config
 
-class SensitiveFormatter(logging.Formatter):
-    def __init__(self, fmt=None, datefmt=None):
-        super().__init__(fmt, datefmt)
-        self.sensitive_patterns = [
-            r'GEMINI_API_KEY=[^\s]*',
-            r'api_key=[^\s]*',
-            r'key=[^\s]*'
-        ]
+log_pipeline = None
 
-    def format(self, record):
-        message = super().format(record)
-        for pattern in self.sensitive_patterns:
-            message = re.sub(pattern, '[REDACTED]', message)
-        return message
+def configure_logging(stream=sys.stdout):
+    global log_pipeline
+    level = logging.getLevelName(os.getenv('WORD_LOOKUP_LOG_LEVEL', 'INFO').upper())
+    log_pipeline = start_log_pipeline(
+        os.path.join(get_app_data_dir(), 'word_lookup.log'),
+        level=level if isinstance(level, int) else logging.INFO,
+        stream=stream
+    )
 
-log_file = os.path.join(get_app_data_dir(), 'word_lookup.log')
-formatter = SensitiveFormatter('%(asctime)s - %(levelname)s - %(message)s')
-file_handler = logging.FileHandler(log_file)
-file_handler.setFormatter(formatter)
-stream_handler = logging.StreamHandler(sys.stdout)
-stream_handler.setFormatter(formatter)
+gemini_client = None
+gemini_client_lock = threading.Lock()
 
-logging.basicConfig(
-    level=logging.INFO,
-    handlers=[file_handler, stream_handler]
-)
+def get_gemini_client():
+    global gemini_client
+    with gemini_client_lock:
+        if gemini_client is None:
+            gemini_client = create_gemini_client()
+    return gemini_client
 
-logging.info("Starting application...")
-load_dotenv()
+def create_gemini_client():
+    # WORD_LOOKUP_BACKENDS lists models to hedge across, primary first, e.g.
+    # "gemini-2.0-flash-lite,gemini-2.0-flash" (model@base_url for another
+    # endpoint). A single backend is used directly, without hedging.
+    backends = parse_backends(os.getenv('WORD_LOOKUP_BACKENDS', ''))
+    if len(backends) < 2:
+        return backends[0].client if backends else GeminiClient()
+    logging.info(f"Hedging Gemini requests across {', '.join(backend.name for backend in backends)}")
+    return HedgedClient(backends, max_hedge_ratio=float(os.getenv('WORD_LOOKUP_HEDGE_BUDGET', '0.15')))
 
-if len(sys.argv) > 1 and sys.argv[1] == "--startup":
-    run_as_admin()
+def has_stored_api_key():
+    return get_secure_config().has_api_key()
 
 def load_api_key():
     logging.info("Loading API key...")
     
-    config_file = os.path.join(get_app_data_dir(), 'config.json')
-    if os.path.exists(config_file):
-        try:
-            with open(config_file, 'r') as f:
-                config = json.load(f)
-                encrypted_key = config.get('api_key')
-                if encrypted_key:
-                    api_key = decrypt_api_key(encrypted_key)
-                    if api_key:
-                        logging.info("API key loaded from secure storage")
-                        return api_key
-        except Exception as e:
-            logging.warning(f"Error loading stored API key: {str(e)}")
+    try:
+        api_key = get_secure_config().api_key()
+        if api_key:
+            logging.info("API key loaded from secure storage")
+            return api_key
+    except Exception as e:
+        logging.warning(f"Error loading stored API key: {str(e)}")
     
     logging.info("No stored API key found, showing input dialog...")
     
     try:
+        import tkinter as tk
+        import tkinter.messagebox
+
         root = tk.Tk()
         root.title("Word Lookup - API Key Required")
         
@@ -210,16 +223,8 @@ def load_api_key():
                 
             logging.info("Validating API key...")
             try:
-                url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-lite:generateContent?key={key}"
-                response = requests.post(url, json={
-                    "contents": [{"parts": [{"text": "test"}]}]
-                })
-                response.raise_for_status()
-                
-                encrypted_key = encrypt_api_key(key)
-                os.makedirs(os.path.dirname(config_file), exist_ok=True)
-                with open(config_file, 'w') as f:
-                    json.dump({'api_key': encrypted_key}, f)
+                get_gemini_client().validate_key(key)
+                get_secure_config().save_api_key(key)
                 
                 result[0] = key
                 root.quit()
@@ -325,66 +330,249 @@ def load_api_key():
         key = input("API Key: ").strip()
         if key:
             try:
-                encrypted_key = encrypt_api_key(key)
-                os.makedirs(os.path.dirname(config_file), exist_ok=True)
-                with open(config_file, 'w') as f:
-                    json.dump({'api_key': encrypted_key}, f)
+                get_secure_config().save_api_key(key)
                 return key
             except Exception as e2:
                 logging.error(f"Error saving API key from command line: {str(e2)}")
                 raise ValueError("Failed to save API key")
         raise ValueError("No API key provided")
 
-try:
-    api_key = load_api_key()
-except Exception as e:
-    logging.error(f"Failed to load API key: {str(e)}")
-    sys.exit(1)
-
-if not api_key:
-    logging.error("GEMINI_API_KEY not found in environment variables.")
-    raise ValueError("GEMINI_API_KEY not found in environment variables. Please check your .env file.")
-
+api_key = None
 monitoring = True
 last_processed_text = ""
+lookup_cache = None
+cache_packs = None
+local_dictionary = None
+lookup_service = None
+prefetcher = None
+phrase_validator = is_valid_phrase
+paragraph_mode = False
+paragraph_filter = None
+paragraph_filter_lock = threading.Lock()
+last_paragraph_words = ()
+clipboard_source = None
+popup_manager = None
+services_ready = threading.Event()
 
-def get_meaning_and_synonyms_from_gemini(phrase):
-    logging.debug(f"Getting meaning for phrase: {phrase}")
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-lite:generateContent?key={api_key}"
-    headers = {
-        "Content-Type": "application/json"
-    }
-    prompt_text = (
-        f"Provide a short, clear meaning and 3 synonyms for the word or phrase: \"{phrase}\".\n"
-        "Format your answer like this:\nMeaning: <meaning here>\nSynonyms: synonym1, synonym2, synonym3"
+def create_phrase_validator():
+    # WORD_LOOKUP_PHRASE_RULES, e.g. "unicode,hyphens,apostrophes,max_words=4"
+    options = {}
+    for rule in os.getenv('WORD_LOOKUP_PHRASE_RULES', '').split(','):
+        name, _, value = rule.strip().partition('=')
+        if name in ('unicode', 'hyphens', 'apostrophes'):
+            options[name] = True
+        elif name in ('max_words', 'max_chars') and value.isdigit():
+            options[name] = int(value)
+        elif name:
+            logging.warning(f"Unknown phrase rule: {name}")
+    return PhraseValidator(**options) if options else is_valid_phrase
+
+def get_base_paths():
+    if getattr(sys, 'frozen', False):
+        base_paths = [os.path.dirname(sys.executable), getattr(sys, '_MEIPASS', "")]
+    else:
+        base_paths = [os.path.dirname(os.path.abspath(__file__))]
+    return [base_path for base_path in base_paths if base_path]
+
+def get_local_dictionary_paths():
+    return [
+        os.getenv('WORD_LOOKUP_DICTIONARY'),
+        os.path.join(get_app_data_dir(), 'dictionary.wldx')
+    ] + [os.path.join(base_path, 'dictionary.wldx') for base_path in get_base_paths()]
+
+def get_cache_pack_paths():
+    # WORD_LOOKUP_CACHE_PACKS lists extra packs; packs dropped into the app
+    # data directory come before the ones the installer shipped.
+    extra = [path for path in os.getenv('WORD_LOOKUP_CACHE_PACKS', '').split(os.pathsep) if path]
+    return extra + find_pack_paths([get_app_data_dir()] + get_base_paths())
+
+def get_word_frequency_paths():
+    return [
+        os.getenv('WORD_LOOKUP_WORD_FREQUENCY'),
+        os.path.join(get_app_data_dir(), 'word_frequency.txt')
+    ] + [os.path.join(base_path, 'word_frequency.txt') for base_path in get_base_paths()]
+
+def get_paragraph_filter():
+    # Loaded the first time paragraph mode needs it.
+    global paragraph_filter
+    with paragraph_filter_lock:
+        if paragraph_filter is None:
+            paragraph_filter = open_frequency_filter(get_word_frequency_paths())
+    return paragraph_filter
+
+def init_lookup_services(fuzzy=True):
+    global lookup_cache, cache_packs, local_dictionary, lookup_service
+    resident = None
+    if os.getenv('WORD_LOOKUP_RESIDENT_CACHE', '0') == '1':
+        # Keeps every cached lookup in memory, packed, so repeat words never
+        # touch SQLite.
+        resident = CompactStore()
+    lookup_cache = LookupCache(os.path.join(get_app_data_dir(), 'lookup_cache.db'), resident=resident)
+    if resident is not None:
+        logging.info(f"Loaded {len(resident)} cached lookups into memory "
+                     f"({resident.memory_usage() // 1024} KiB)")
+    cache_packs = open_cache_packs(get_cache_pack_paths())
+    local_dictionary = open_local_dictionary(get_local_dictionary_paths())
+    matcher = None
+    # Without the local dictionary there's no telling a misspelling from a
+    # real word that only looks like a known one, so nothing is matched.
+    if fuzzy and local_dictionary is not None and os.getenv('WORD_LOOKUP_FUZZY', '1') != '0':
+        matcher = WordMatcher(lexicon=[local_dictionary])
+        threading.Thread(target=index_known_words, args=(matcher,), name="fuzzy-index", daemon=True).start()
+    lookup_service = LookupService(
+        get_gemini_client(),
+        cache=lookup_cache,
+        dictionary=local_dictionary,
+        streaming=os.getenv('WORD_LOOKUP_STREAMING', '1') != '0',
+        matcher=matcher,
+        packs=cache_packs,
+        profile=get_profile(os.getenv('WORD_LOOKUP_PROFILE'))
     )
-    data = {
-        "contents": [
-            {
-                "parts": [
-                    {
-                        "text": prompt_text
-                    }
-                ]
-            }
-        ]
-    }
 
+def index_known_words(matcher):
+    # Filled in the background; until it finishes, fewer copies are matched.
+    start = time.perf_counter()
     try:
-        response = requests.post(url, headers=headers, json=data)
-        response.raise_for_status()
-        res_json = response.json()
-        answer = res_json["candidates"][0]["content"]["parts"][0]["text"].strip()
-        meaning = ""
-        synonyms = ""
-        for line in answer.split("\n"):
-            if line.lower().startswith("meaning:"):
-                meaning = line.split(":", 1)[1].strip()
-            elif line.lower().startswith("synonyms:"):
-                synonyms = line.split(":", 1)[1].strip()
-        return meaning, synonyms
+        word_filter = get_paragraph_filter()
+        if word_filter is not None:
+            matcher.add_lexicon(word_filter.common)
+        matcher.update(phrase for phrase, _, _ in lookup_cache.entries())
+        if cache_packs is not None:
+            matcher.update(cache_packs.headwords())
+        matcher.update(local_dictionary.headwords())
     except Exception as e:
-        return f"⚠️ Error: {str(e)}", ""
+        logging.error(f"Failed to index known words: {str(e)}")
+    logging.info(f"Indexed {len(matcher)} known words for fuzzy matching "
+                 f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+def start_prefetcher():
+    global prefetcher
+    if os.getenv('WORD_LOOKUP_PREFETCH', '0') != '1':
+        return
+    prefetcher = Prefetcher(
+        lookup_service,
+        phrase_validator,
+        budget_per_hour=int(os.getenv('WORD_LOOKUP_PREFETCH_BUDGET', '60'))
+    )
+    prefetcher.start()
+
+def get_daemon_address():
+    return os.getenv('WORD_LOOKUP_DAEMON')
+
+def start_lookup_backend(use_daemon=True, fuzzy=True):
+    # With WORD_LOOKUP_DAEMON set, the tray app is a thin client of a shared
+    # lookup daemon and needs no key, cache or Gemini connection of its own.
+    global api_key, lookup_service
+    if use_daemon and get_daemon_address():
+        host, port = parse_address(get_daemon_address())
+        lookup_service = LookupClient(host, port, token=os.getenv('WORD_LOOKUP_DAEMON_TOKEN'))
+        logging.info(f"Using lookup daemon at {host}:{port}")
+        return
+
+    with startup_profile.phase("load api key"):
+        if api_key is None:
+            api_key = load_api_key()
+    if not api_key:
+        raise ValueError("No API key provided")
+
+    with startup_profile.phase("create gemini client"):
+        client = get_gemini_client()
+        client.api_key = api_key
+        client.limiter = RateLimiter(
+            requests_per_minute=int(os.getenv('WORD_LOOKUP_RPM', '30')),
+            daily_limit=int(os.getenv('WORD_LOOKUP_DAILY_QUOTA', '1500')),
+            quota_path=os.path.join(get_app_data_dir(), 'quota.json')
+        )
+        atexit.register(client.limiter.save)
+        client.warm_up()
+        config = get_secure_config()
+        config.on_change(swap_api_key)
+        config.watch()
+
+    with startup_profile.phase("open lookup services"):
+        init_lookup_services(fuzzy)
+        start_prefetcher()
+
+def swap_api_key(new_key):
+    # Requests read client.api_key when they are sent, so in-flight lookups
+    # finish on the old key and the next one uses the new key.
+    global api_key
+    api_key = new_key
+    get_gemini_client().api_key = new_key
+    logging.info("API key updated")
+
+def replace_api_key(new_key, icon):
+    try:
+        get_gemini_client().validate_key(new_key)
+        get_secure_config().save_api_key(new_key)
+        icon.notify("Word Lookup", "API key updated")
+    except Exception as e:
+        logging.error(f"API key validation failed: {str(e)}")
+        icon.notify("Word Lookup", "The new API key was rejected, the old one is still in use")
+
+def initialize_services(icon=None):
+    # Runs in the background once the tray icon is up, so decrypting the key,
+    # importing requests/cryptography/tkinter and opening the cache do not
+    # delay startup. Lookups wait on services_ready until this is done.
+    global popup_manager
+    try:
+        start_lookup_backend()
+
+        with startup_profile.phase("start popup ui"):
+            from popup_ui import PopupManager
+            popup_manager = PopupManager()
+            popup_manager.start()
+
+        start_instrumentation()
+    except Exception as e:
+        logging.error(f"Failed to initialize: {str(e)}")
+        if icon:
+            icon.stop()
+        return False
+
+    services_ready.set()
+    logging.info(f"Services ready after {startup_profile.elapsed() * 1000:.0f} ms")
+    return True
+
+def get_metrics_file():
+    return os.path.join(get_app_data_dir(), 'metrics.prom')
+
+def start_instrumentation():
+    if os.getenv('WORD_LOOKUP_METRICS', '1') == '0':
+        metrics.enabled = False
+        return
+    start_metrics_dump(get_metrics_file())
+    port = os.getenv('WORD_LOOKUP_METRICS_PORT')
+    if port:
+        try:
+            start_metrics_server(int(port))
+        except Exception as e:
+            logging.error(f"Failed to start metrics endpoint: {str(e)}")
+
+def get_stats_text():
+    lines = [metrics.summary(), "", "Lookup pipeline"]
+    for name, value in lookup_pipeline.stats.snapshot().items():
+        lines.append(f"{name:<30} {value}")
+    if lookup_service:
+        lines.append("")
+        lines.append(f"Lookup service: {lookup_service.stats()}")
+        if isinstance(lookup_service, LookupService) and lookup_service.client.limiter:
+            lines.append(f"Rate limiter: {lookup_service.client.limiter.stats()}")
+        if isinstance(lookup_service, LookupService) and isinstance(lookup_service.client, HedgedClient):
+            lines.append(f"Hedging: {lookup_service.client.stats()}")
+    if prefetcher:
+        lines.append(f"Prefetch: {prefetcher.stats()}")
+    if paragraph_filter:
+        lines.append(f"Paragraph mode: {paragraph_filter.selected} of {paragraph_filter.scanned} "
+                     f"distinct words looked up, {paragraph_pipeline.stats.snapshot()}")
+    return "\n".join(lines)
+
+def lookup_phrase(phrase, progress=None):
+    services_ready.wait()
+    meaning, synonyms = lookup_service.lookup(phrase, progress)
+    if prefetcher:
+        prefetcher.record_lookup(phrase, meaning, synonyms)
+    return meaning, synonyms
 
 def get_mouse_pos():
     class POINT(ctypes.Structure):
@@ -393,115 +581,58 @@ def get_mouse_pos():
     ctypes.windll.user32.GetCursorPos(ctypes.byref(pt))
     return pt.x, pt.y
 
-class Popup(tk.Tk):
-    def __init__(self, phrase, meaning, synonyms, x, y, duration=5000):
-        super().__init__()
-        self.overrideredirect(True)
-        self.attributes("-topmost", True)
-        self.configure(bg="#001d35")
-        
-        self.timer_id = None
-        
-        screen_width = self.winfo_screenwidth()
-        screen_height = self.winfo_screenheight()
-        
-        main_frame = tk.Frame(self, bg="#001d35", cursor="hand2")
-        main_frame.pack(expand=True, fill='both', padx=2, pady=2)
-        
-        close_button = tk.Button(main_frame, text='×', command=self.destroy,
-                               bg='#001d35', fg='white', font=('Arial', 12, 'bold'),
-                               relief='flat', padx=5, pady=0)
-        close_button.pack(side='top', anchor='ne')
-        
-        text = f"{phrase}:\n\nMeaning:\n{meaning}\n\nSynonyms:\n{synonyms}"
-        
-        label = tk.Label(main_frame, text=text, bg="#001d35", fg="white",
-                        font=("Segoe UI", 10), justify="left",
-                        relief="solid", borderwidth=1, padx=10, pady=5)
-        label.pack(expand=True, fill='both', padx=5, pady=5)
-        
-        main_frame.bind('<Button-1>', self._start_drag)
-        main_frame.bind('<B1-Motion>', self._on_drag)
-        
-        self.bind('<Enter>', self._on_enter)
-        self.bind('<Leave>', self._on_leave)
-        
-        self.duration = duration
-        
-        self._drag_data = {"x": 0, "y": 0}
-        
-        self.update_idletasks()
-        window_width = self.winfo_width()
-        window_height = self.winfo_height()
-        
-        x = min(max(x, 0), screen_width - window_width)
-        y = min(max(y, 0), screen_height - window_height)
-        
-        self.geometry(f"+{x}+{y}")
-        self._start_timer()
-    
-    def _start_drag(self, event):
-        self._drag_data["x"] = event.x
-        self._drag_data["y"] = event.y
-    
-    def _on_drag(self, event):
-        x = self.winfo_x() + (event.x - self._drag_data["x"])
-        y = self.winfo_y() + (event.y - self._drag_data["y"])
-        
-        screen_width = self.winfo_screenwidth()
-        screen_height = self.winfo_screenheight()
-        
-        x = min(max(x, 0), screen_width - self.winfo_width())
-        y = min(max(y, 0), screen_height - self.winfo_height())
-        
-        self.geometry(f"+{x}+{y}")
-    
-    def _start_timer(self):
-        if self.timer_id:
-            self.after_cancel(self.timer_id)
-        self.timer_id = self.after(self.duration, self.destroy)
-    
-    def _on_enter(self, event):
-        if self.timer_id:
-            self.after_cancel(self.timer_id)
-    
-    def _on_leave(self, event):
-        self._start_timer()
-
 def show_popup(phrase, meaning, synonyms):
     x, y = get_mouse_pos()
-    popup_x = x + 20
-    popup_y = y + 20
+    popup_manager.show(phrase, meaning, synonyms, x + 20, y + 20)
 
-    def popup_thread():
-        popup = Popup(phrase, meaning, synonyms, popup_x, popup_y)
-        popup.mainloop()
+def lookup_words(words):
+    services_ready.wait()
+    return lookup_service.lookup_many(words), len(words)
 
-    threading.Thread(target=popup_thread, daemon=True).start()
+def show_word_list(words, entries, count):
+    x, y = get_mouse_pos()
+    title = f"{count} difficult word{'s' if count != 1 else ''}"
+    popup_manager.show_text(title, format_entries(entries), x + 20, y + 20)
 
-def is_valid_phrase(text):
-    text = re.sub(r'\s+', ' ', text.strip())
-    if 1 <= len(text.split()) <= 3 and re.fullmatch(r'[A-Za-z ]+', text):
-        return text
-    return None
+lookup_pipeline = LookupPipeline(lookup_phrase, show_popup, on_progress=show_popup)
+paragraph_pipeline = LookupPipeline(lookup_words, show_word_list, workers=1, max_queue=2)
+PARAGRAPH_MAX_CHARS = 200000
 
 def clipboard_monitor():
-    global last_processed_text
+    global last_processed_text, last_paragraph_words, paragraph_mode
     while True:
-        time.sleep(0.3)
-        
-        if not monitoring:
-            last_processed_text = pyperclip.paste().strip()
-            continue
-
         try:
-            current_text = pyperclip.paste().strip()
-            valid_phrase = is_valid_phrase(current_text)
+            if not clipboard_source.wait_for_change():
+                continue
+
+            metrics.incr("clipboard_changes")
+            with metrics.timer("clipboard_read"):
+                current_text = clipboard_source.read()
+            with metrics.timer("validate"):
+                valid_phrase = phrase_validator(current_text)
+            if not monitoring:
+                last_processed_text = valid_phrase or ""
+                continue
+
+            if prefetcher and valid_phrase != last_processed_text:
+                prefetcher.add_context(current_text)
 
             if valid_phrase and valid_phrase != last_processed_text:
                 last_processed_text = valid_phrase
-                meaning, synonyms = get_meaning_and_synonyms_from_gemini(valid_phrase)
-                show_popup(valid_phrase, meaning, synonyms)
+                lookup_pipeline.submit(valid_phrase)
+            elif not valid_phrase and paragraph_mode and len(current_text) <= PARAGRAPH_MAX_CHARS:
+                # Only the uncommon words of a copied sentence or paragraph
+                # are looked up, together, and shown in one popup.
+                word_filter = get_paragraph_filter()
+                if word_filter is None:
+                    paragraph_mode = False
+                    logging.error("No word frequency table found, paragraph mode disabled")
+                    continue
+                with metrics.timer("paragraph_scan"):
+                    words = tuple(word_filter.difficult_words(current_text))
+                if words and words != last_paragraph_words:
+                    last_paragraph_words = words
+                    paragraph_pipeline.submit(words)
         except Exception as e:
             logging.error(f"Error in clipboard monitor: {str(e)}")
 
@@ -680,9 +811,19 @@ def on_startup_toggle(icon, item):
 import os
 import sys
 
+@functools.lru_cache(maxsize=4)
+def load_tray_image(icon_path):
+    from PIL import Image
+    image = Image.open(icon_path)
+    image.load()
+    return image
+
 def create_system_tray():
     logging.info("Creating system tray icon...")
     try:
+        import pystray
+        from PIL import Image
+
         global icon
         if 'icon' in globals() and icon is not None:
             try:
@@ -721,7 +862,7 @@ def create_system_tray():
             logging.info("Created default icon as fallback")
 
         try:
-            image = Image.open(icon_path)
+            image = load_tray_image(icon_path)
             logging.info("System tray icon loaded successfully")
         except Exception as e:
             logging.error(f"Failed to load icon: {str(e)}")
@@ -730,6 +871,18 @@ def create_system_tray():
         def on_exit(icon, item):
             global monitoring
             monitoring = False
+            logging.info(f"Lookup pipeline stats: {lookup_pipeline.stats.snapshot()}")
+            if services_ready.is_set():
+                logging.info(f"Lookup stats: {lookup_service.stats()}")
+                if prefetcher:
+                    prefetcher.stop()
+                    logging.info(f"Prefetch stats: {prefetcher.stats()}")
+                if metrics.enabled:
+                    try:
+                        metrics.dump(get_metrics_file())
+                    except Exception as e:
+                        logging.warning(f"Failed to write metrics file: {str(e)}")
+                popup_manager.stop()
             icon.stop()
             logging.info("Application exiting...")
 
@@ -737,13 +890,46 @@ def create_system_tray():
             global monitoring, last_processed_text
             monitoring = not monitoring
             if monitoring:
-                last_processed_text = pyperclip.paste().strip()
+                last_processed_text = phrase_validator(clipboard_source.read()) or ""
                 logging.info("Monitoring enabled")
                 icon.notify("Word Lookup", "Word lookup is now enabled")
             else:
                 logging.info("Monitoring disabled")
                 icon.notify("Word Lookup", "Word lookup is now disabled")
 
+        def on_paragraph_toggle(icon, item):
+            global paragraph_mode
+            paragraph_mode = not paragraph_mode
+            logging.info(f"Paragraph mode {'enabled' if paragraph_mode else 'disabled'}")
+
+        def on_debug_toggle(icon, item):
+            debug = log_pipeline.level != logging.DEBUG
+            log_pipeline.set_level(logging.DEBUG if debug else logging.INFO)
+            logging.info(f"Debug logging {'enabled' if debug else 'disabled'}")
+
+        def on_stats(icon, item):
+            if services_ready.is_set():
+                popup_manager.show_stats(get_stats_text)
+            else:
+                icon.notify("Word Lookup", "Still starting up, try again in a moment")
+
+        def ask_api_key():
+            # Runs on the popup UI thread; the key is checked off that thread.
+            import tkinter.simpledialog
+            key = tkinter.simpledialog.askstring(
+                "Word Lookup", "Enter your new Gemini API key:", show="*", parent=popup_manager.root
+            )
+            if key and key.strip():
+                threading.Thread(target=replace_api_key, args=(key.strip(), icon), daemon=True).start()
+
+        def on_change_key(icon, item):
+            if get_daemon_address():
+                icon.notify("Word Lookup", "The API key is managed by the lookup daemon")
+            elif services_ready.is_set():
+                popup_manager.call(ask_api_key)
+            else:
+                icon.notify("Word Lookup", "Still starting up, try again in a moment")
+
         def on_startup_toggle(icon, item):
             current_state = is_in_startup()
             if current_state:
@@ -773,6 +959,18 @@ def create_system_tray():
                 on_startup_toggle,
                 checked=lambda _: is_in_startup()
             ),
+            pystray.MenuItem(
+                "Paragraph Mode",
+                on_paragraph_toggle,
+                checked=lambda _: paragraph_mode
+            ),
+            pystray.MenuItem("Stats", on_stats),
+            pystray.MenuItem("Change API Key...", on_change_key),
+            pystray.MenuItem(
+                "Debug Logging",
+                on_debug_toggle,
+                checked=lambda _: log_pipeline.level == logging.DEBUG
+            ),
             pystray.MenuItem("Exit", on_exit)
         )
 
@@ -790,11 +988,79 @@ def create_system_tray():
         logging.error(f"Error creating system tray: {str(e)}")
         return None
 
-if __name__ == "__main__":
+def run_daemon():
+    start_lookup_backend(use_daemon=False)
+    start_instrumentation()
+    host, port = parse_address(get_daemon_address())
+    daemon = LookupDaemon(lookup_service, host, port, token=os.getenv('WORD_LOOKUP_DAEMON_TOKEN'),
+                          validate=phrase_validator)
+    services_ready.set()
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        logging.info(f"Lookup daemon stats: {daemon.stats()}")
+        lookup_cache.close()
+
+def run_bulk(argv):
+    # Headless: no tray, clipboard or Tk. Results go to --output (or stdout),
+    # progress and logs to stderr.
+    global api_key
+    parser = argparse.ArgumentParser(prog="main.py --bulk", description="Look up a word list without the tray app")
+    parser.add_argument("--bulk", required=True, metavar="WORDS", help="word list, one per line, or - for stdin")
+    parser.add_argument("--output", required=True,
+                        help="JSONL results, or - for stdout; rerunning with the same file resumes")
+    parser.add_argument("--workers", type=int, default=4, help="batches looked up at the same time")
+    parser.add_argument("--batch-size", type=int, default=8, help="words per Gemini request")
+    parser.add_argument("--report-every", type=float, default=10.0, help="seconds between progress lines")
+    args = parser.parse_args(argv)
+
+    if not get_daemon_address():
+        api_key = os.getenv('GEMINI_API_KEY') or get_secure_config().api_key()
+        if not api_key:
+            logging.error("No API key: set GEMINI_API_KEY or save one by running the tray app once")
+            return 1
+    # The glossary gets real answers only, never one borrowed from a
+    # similar known word.
+    start_lookup_backend(fuzzy=False)
+    services_ready.set()
+
+    limiter = None
+    if isinstance(lookup_service, LookupService):
+        lookup_service.streaming = False
+        limiter = lookup_service.client.limiter
+        # A bulk run waits out the rate limit instead of failing words.
+        limiter.max_wait = 3600
+    bulk = BulkLookup(lookup_service, args.output, workers=args.workers, batch_size=args.batch_size,
+                      validate=phrase_validator, limiter=limiter, report_interval=args.report_every)
+    try:
+        counts = bulk.run(read_words(args.bulk))
+    finally:
+        if lookup_cache is not None:
+            lookup_cache.close()
+    return 1 if counts["errors"] or bulk.stop_reason else 0
+
+def main():
+    global api_key, icon, clipboard_source, phrase_validator, paragraph_mode
+
+    load_dotenv()
+    configure_logging(stream=sys.stderr if "--bulk" in sys.argv else sys.stdout)
+    logging.info("Starting application...")
+    phrase_validator = create_phrase_validator()
+    paragraph_mode = os.getenv('WORD_LOOKUP_PARAGRAPH', '0') == '1'
+    startup_profile.mark("configure logging")
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--startup":
+        run_as_admin()
+
     logging.info("Application main entry point")
     try:
         if len(sys.argv) > 1 and sys.argv[1] == "--startup":
             logging.info("Handling startup action...")
+            import tkinter as tk
+            import tkinter.messagebox
+
             result = handle_startup_action()
             if result is True:
                 root = tk.Tk()
@@ -810,11 +1076,36 @@ if __name__ == "__main__":
                 sys.exit(1)
             sys.exit(0)
 
-        icon = create_system_tray()
+        if "--daemon" in sys.argv:
+            run_daemon()
+            return
+
+        if "--bulk" in sys.argv:
+            sys.exit(run_bulk(sys.argv[1:]))
+
+        if not get_daemon_address() and not has_stored_api_key():
+            # First run: the key dialog has to be answered before anything else.
+            with startup_profile.phase("api key dialog"):
+                api_key = load_api_key()
+
+        with startup_profile.phase("create system tray"):
+            icon = create_system_tray()
         if icon:
+            clipboard_source = create_clipboard_source(os.getenv('WORD_LOOKUP_CLIPBOARD_BACKEND', 'auto'))
+            logging.info(f"Clipboard backend: {clipboard_source.name}")
+            lookup_pipeline.start()
+            paragraph_pipeline.start()
             monitor_thread = threading.Thread(target=clipboard_monitor, daemon=True)
             monitor_thread.start()
-            
+            startup_profile.mark("start monitoring")
+            logging.info(f"Tray ready after {startup_profile.elapsed() * 1000:.0f} ms")
+
+            if startup_profile.enabled:
+                initialize_services()
+                print(startup_profile.report())
+                sys.exit(0)
+
+            threading.Thread(target=initialize_services, args=(icon,), name="startup-init", daemon=True).start()
             icon.run()
         else:
             logging.error("Failed to create system tray icon")
@@ -823,3 +1114,6 @@ if __name__ == "__main__":
     except Exception as e:
         logging.error(f"Error in main: {str(e)}")
         sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+import argparse
+import collections
+import logging
+import os
+import re
+import sys
+
+from fuzzy_match import lemma_candidates
+
+# Paragraph mode: when more than a phrase is copied, pick out the few words a
+# reader is likely to stumble on and look only those up. A word is easy when it
+# (or a regular inflection of it) is in the bundled frequency table; names and
+# short words are skipped as well, so most of a paste never leaves this module.
+
+WORD_PATTERN = re.compile(r"[A-Za-z]+(?:['’-][A-Za-z]+)*")
+# A capitalised word right after one of these starts a sentence rather than
+# naming something. A full stop after a title is not a sentence end.
+SENTENCE_PATTERN = re.compile(
+    r"(?:[!?:;\"“(]|\.(?<!\bMr\.)(?<!\bMrs\.)(?<!\bMs\.)(?<!\bDr\.)(?<!\bSt\.))\s*([A-Z][a-z]+)"
+)
+CONTRACTION_PATTERN = re.compile(r"(?:n['’]t|['’](?:s|re|ve|ll|d|m))$")
+DERIVED_SUFFIXES = ("ness", "less", "fully", "ful", "ment", "able")
+
+def tokenize(text):
+    return WORD_PATTERN.findall(text)
+
+def load_frequency_table(path):
+    ranks = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            word = line.strip().lower()
+            if word and not word.startswith("#"):
+                ranks.setdefault(word, len(ranks))
+    return ranks
+
+class DifficultWordFilter:
+    def __init__(self, ranks, max_rank=None, min_length=5, max_words=12, min_text_words=4):
+        self.max_rank = len(ranks) if max_rank is None else max_rank
+        self.common = frozenset(word for word, rank in ranks.items() if rank < self.max_rank)
+        self.min_length = min_length
+        self.max_words = max_words
+        self.min_text_words = min_text_words
+        self.scanned = 0
+        self.selected = 0
+
+    def __len__(self):
+        return len(self.common)
+
+    def is_common(self, word):
+        if word in self.common:
+            return True
+        if "'" in word or "’" in word:
+            word = CONTRACTION_PATTERN.sub("", word)
+        if "-" in word:
+            return all(self.is_common(part) for part in word.split("-"))
+        if len(word) < self.min_length or word in self.common:
+            return True
+        if any(lemma in self.common for lemma in lemma_candidates(word)):
+            return True
+        # Plain derivations of a common word ("tiredness", "unhappy").
+        for suffix in DERIVED_SUFFIXES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+                stem = word[:-len(suffix)]
+                if stem in self.common or any(lemma in self.common for lemma in lemma_candidates(stem)):
+                    return True
+        return word.startswith("un") and word[2:] in self.common
+
+    def difficult_words(self, text):
+        # Each distinct spelling is judged once, in order of first appearance.
+        # A rare capitalised word that only ever appears mid-sentence is taken
+        # to be a name; it is kept when it also starts a sentence or appears
+        # in lower case.
+        tokens = tokenize(text)
+        if len(tokens) < self.min_text_words:
+            return []
+        first = tokens[0]
+        tokens = dict.fromkeys(tokens)
+        sentence_starts = None
+        seen = set()
+        words = []
+        for token in tokens:
+            if len(token) < self.min_length:
+                continue
+            word = token.lower()
+            if word in seen:
+                continue
+            seen.add(word)
+            if self.is_common(word):
+                continue
+            if word != token and word not in tokens:
+                if not token[1:].islower():
+                    continue
+                if sentence_starts is None:
+                    sentence_starts = set(SENTENCE_PATTERN.findall(text))
+                    sentence_starts.add(first)
+                if token not in sentence_starts:
+                    continue
+            words.append(word)
+        self.scanned += len(tokens)
+        self.selected += min(len(words), self.max_words)
+        return words[:self.max_words]
+
+def open_frequency_filter(paths, **kwargs):
+    for path in paths:
+        if path and os.path.exists(path):
+            try:
+                word_filter = DifficultWordFilter(load_frequency_table(path), **kwargs)
+                logging.info(f"Loaded {len(word_filter)} common words from {path}")
+                return word_filter
+            except Exception as e:
+                logging.error(f"Failed to load word frequency table {path}: {str(e)}")
+    return None
+
+def format_entries(entries):
+    lines = []
+    for word, meaning, synonyms in entries:
+        lines.append(f"{word}: {meaning}" + (f"\n    ({synonyms})" if synonyms else ""))
+    return "\n\n".join(lines)
+
+def count_words(paths):
+    counts = collections.Counter()
+    for path in paths:
+        handle = sys.stdin if path == "-" else open(path, "r", encoding="utf-8", errors="replace")
+        try:
+            for line in handle:
+                counts.update(word.lower() for word in tokenize(line))
+        finally:
+            if handle is not sys.stdin:
+                handle.close()
+    return counts
+
+def write_frequency_table(counts, path, top):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("# Common English words, most frequent first, one per line.\n")
+        for word, _ in counts.most_common(top):
+            f.write(f"{word}\n")
+    os.replace(tmp_path, path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or try out the paragraph mode word frequency table")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="count the words of a plain text corpus")
+    build.add_argument("sources", nargs="+", help="text files, or - for stdin")
+    build.add_argument("output")
+    build.add_argument("--top", type=int, default=5000, help="how many of the most frequent words to keep")
+    scan = sub.add_parser("scan", help="list the words paragraph mode would look up in a text")
+    scan.add_argument("table")
+    scan.add_argument("text", help="text file, or - for stdin")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        counts = count_words(args.sources)
+        write_frequency_table(counts, args.output, args.top)
+        print(f"Wrote {min(args.top, len(counts))} of {len(counts)} distinct words to {args.output}")
+    else:
+        handle = sys.stdin if args.text == "-" else open(args.text, "r", encoding="utf-8")
+        with handle:
+            text = handle.read()
+        word_filter = DifficultWordFilter(load_frequency_table(args.table), max_words=sys.maxsize)
+        print("\n".join(word_filter.difficult_words(text)))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
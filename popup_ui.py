@@ -0,0 +1,238 @@
+import logging
+import queue
+import threading
+import time
+import tkinter as tk
+
+from instrumentation import metrics
+
+POPUP_BG = "#001d35"
+
+class Popup(tk.Toplevel):
+    def __init__(self, master, duration=5000):
+        super().__init__(master)
+        self.withdraw()
+        self.overrideredirect(True)
+        self.attributes("-topmost", True)
+        self.configure(bg=POPUP_BG)
+
+        self.duration = duration
+        self.timer_id = None
+        self.in_use = False
+        self.shown_at = 0.0
+        self.phrase = None
+        self._drag_data = {"x": 0, "y": 0}
+
+        main_frame = tk.Frame(self, bg=POPUP_BG, cursor="hand2")
+        main_frame.pack(expand=True, fill='both', padx=2, pady=2)
+
+        close_button = tk.Button(main_frame, text='×', command=self.hide,
+                               bg=POPUP_BG, fg='white', font=('Arial', 12, 'bold'),
+                               relief='flat', padx=5, pady=0)
+        close_button.pack(side='top', anchor='ne')
+
+        self.label = tk.Label(main_frame, text="", bg=POPUP_BG, fg="white",
+                        font=("Segoe UI", 10), justify="left",
+                        relief="solid", borderwidth=1, padx=10, pady=5)
+        self.label.pack(expand=True, fill='both', padx=5, pady=5)
+
+        main_frame.bind('<Button-1>', self._start_drag)
+        main_frame.bind('<B1-Motion>', self._on_drag)
+
+        self.bind('<Enter>', self._on_enter)
+        self.bind('<Leave>', self._on_leave)
+
+    def show(self, phrase, meaning, synonyms, x, y):
+        self.phrase = phrase
+        self._set_text(phrase, meaning, synonyms)
+        self._display(x, y)
+
+    def show_text(self, title, text, x, y):
+        self.phrase = title
+        self.label.config(text=f"{title}:\n\n{text}")
+        self.update_idletasks()
+        self._display(x, y)
+
+    def _display(self, x, y):
+        self._place(x, y)
+        self.deiconify()
+        self.lift()
+        self.in_use = True
+        self.shown_at = time.monotonic()
+        self._start_timer()
+
+    def update_text(self, meaning, synonyms):
+        self._set_text(self.phrase, meaning, synonyms)
+        self._place(self.winfo_x(), self.winfo_y())
+        if self.timer_id:
+            self._start_timer()
+
+    def _set_text(self, phrase, meaning, synonyms):
+        self.label.config(text=f"{phrase}:\n\nMeaning:\n{meaning}\n\nSynonyms:\n{synonyms}")
+        self.update_idletasks()
+
+    def _place(self, x, y):
+        screen_width = self.winfo_screenwidth()
+        screen_height = self.winfo_screenheight()
+        x = min(max(x, 0), screen_width - self.winfo_reqwidth())
+        y = min(max(y, 0), screen_height - self.winfo_reqheight())
+        self.geometry(f"+{x}+{y}")
+
+    def hide(self):
+        if self.timer_id:
+            self.after_cancel(self.timer_id)
+            self.timer_id = None
+        self.withdraw()
+        self.in_use = False
+
+    def _start_drag(self, event):
+        self._drag_data["x"] = event.x
+        self._drag_data["y"] = event.y
+
+    def _on_drag(self, event):
+        x = self.winfo_x() + (event.x - self._drag_data["x"])
+        y = self.winfo_y() + (event.y - self._drag_data["y"])
+
+        screen_width = self.winfo_screenwidth()
+        screen_height = self.winfo_screenheight()
+
+        x = min(max(x, 0), screen_width - self.winfo_width())
+        y = min(max(y, 0), screen_height - self.winfo_height())
+
+        self.geometry(f"+{x}+{y}")
+
+    def _start_timer(self):
+        if self.timer_id:
+            self.after_cancel(self.timer_id)
+        self.timer_id = self.after(self.duration, self.hide)
+
+    def _on_enter(self, event):
+        if self.timer_id:
+            self.after_cancel(self.timer_id)
+            self.timer_id = None
+
+    def _on_leave(self, event):
+        if self.in_use:
+            self._start_timer()
+
+class StatsWindow(tk.Toplevel):
+    def __init__(self, master, get_text):
+        super().__init__(master)
+        self.title("Word Lookup - Stats")
+        self.attributes("-topmost", True)
+        self.get_text = get_text
+
+        self.text = tk.Text(self, font=("Consolas", 9), width=64, height=30, relief="flat")
+        self.text.pack(expand=True, fill='both', padx=5, pady=5)
+        tk.Button(self, text="Refresh", command=self.refresh).pack(side='bottom', pady=(0, 5))
+        self.protocol("WM_DELETE_WINDOW", self.withdraw)
+        self.refresh()
+
+    def refresh(self):
+        self.text.config(state='normal')
+        self.text.delete('1.0', 'end')
+        self.text.insert('1.0', self.get_text())
+        self.text.config(state='disabled')
+
+    def show(self):
+        self.refresh()
+        self.deiconify()
+        self.lift()
+
+class PopupManager:
+    # Tk is only touched from the UI thread. Other threads hand over work
+    # through a queue that the UI thread drains on a short timer.
+    def __init__(self, pool_size=3, poll_interval=30, duration=5000):
+        self.pool_size = pool_size
+        self.poll_interval = poll_interval
+        self.duration = duration
+        self.root = None
+        self._pool = []
+        self._requests = queue.Queue()
+        self._ready = threading.Event()
+        self._thread = None
+        self._stats_window = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="popup-ui", daemon=True)
+        self._thread.start()
+        self._ready.wait(10)
+
+    def stop(self):
+        self._requests.put(("stop", ()))
+
+    def show(self, phrase, meaning, synonyms, x, y):
+        self._requests.put(("show", (phrase, meaning, synonyms, x, y)))
+
+    def show_text(self, title, text, x, y):
+        self.call(self._show_text, title, text, x, y)
+
+    def show_stats(self, get_text):
+        self.call(self._show_stats, get_text)
+
+    def call(self, func, *args):
+        self._requests.put(("call", (func,) + args))
+
+    def _run(self):
+        try:
+            self.root = tk.Tk()
+            self.root.withdraw()
+            self._pool = [Popup(self.root, self.duration) for _ in range(self.pool_size)]
+        except Exception as e:
+            logging.error(f"Failed to start popup UI: {str(e)}")
+            self._ready.set()
+            return
+        self._ready.set()
+        self.root.after(self.poll_interval, self._drain)
+        self.root.mainloop()
+        try:
+            self.root.destroy()
+        except:
+            pass
+
+    def _drain(self):
+        while True:
+            try:
+                action, args = self._requests.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                if action == "show":
+                    self._show(*args)
+                elif action == "call":
+                    args[0](*args[1:])
+                elif action == "stop":
+                    self.root.quit()
+                    return
+            except Exception as e:
+                logging.error(f"Error rendering popup: {str(e)}")
+        self.root.after(self.poll_interval, self._drain)
+
+    def _show(self, phrase, meaning, synonyms, x, y):
+        # A visible popup for the same phrase is updated in place, which is
+        # how streamed answers fill in as more of the response arrives.
+        with metrics.timer("popup_render"):
+            for popup in self._pool:
+                if popup.in_use and popup.phrase == phrase:
+                    popup.update_text(meaning, synonyms)
+                    return
+            self._acquire().show(phrase, meaning, synonyms, x, y)
+
+    def _show_text(self, title, text, x, y):
+        with metrics.timer("popup_render"):
+            self._acquire().show_text(title, text, x, y)
+
+    def _show_stats(self, get_text):
+        if self._stats_window is None:
+            self._stats_window = StatsWindow(self.root, get_text)
+        else:
+            self._stats_window.get_text = get_text
+            self._stats_window.show()
+
+    def _acquire(self):
+        for popup in self._pool:
+            if not popup.in_use:
+                return popup
+        popup = min(self._pool, key=lambda p: p.shown_at)
+        popup.hide()
+        return popup
@@ -0,0 +1,177 @@
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from instrumentation import metrics
+from lookup_cache import is_error_result
+from rate_limiter import PRIORITY_PREFETCH, TokenBucket
+
+WORD_RE = re.compile(r"[A-Za-z]+")
+
+# Short and very common words are almost never looked up, so they are not
+# worth a prefetch even when they sit right next to a copied word.
+COMMON_WORDS = frozenset("""
+about above after again against because before being below between could
+during either every first further having itself might other their there these
+those through under until where which while would should yours
+""".split())
+
+class Prefetcher:
+    # Synonyms of each result, and longer words copied alongside a phrase, are
+    # often the next thing the user looks up. They are queued here and resolved
+    # into the cache while the user is idle, at prefetch priority so the rate
+    # limiter always serves real lookups first, and within `budget_per_hour`.
+    def __init__(self, service, validate, budget_per_hour=60, idle_delay=2.0,
+                 max_queue=32, max_per_lookup=3, min_word_length=6, max_context_chars=2000):
+        self.service = service
+        self.validate = validate
+        self.idle_delay = idle_delay
+        self.max_queue = max_queue
+        self.max_per_lookup = max_per_lookup
+        self.min_word_length = min_word_length
+        self.max_context_chars = max_context_chars
+        self.budget = TokenBucket(budget_per_hour / 3600.0, max(1, min(10, budget_per_hour)))
+
+        self._cond = threading.Condition()
+        self._pending = OrderedDict()
+        self._prefetched = set()
+        self._last_activity = time.monotonic()
+        self._stopped = False
+        self.prefetched = 0
+        self.hits = 0
+        self.skipped = 0
+        self.failed = 0
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="prefetcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=1)
+
+    def record_lookup(self, phrase, meaning, synonyms):
+        key = phrase.lower()
+        with self._cond:
+            self._last_activity = time.monotonic()
+            self._pending.pop(key, None)
+            if key in self._prefetched:
+                self._prefetched.discard(key)
+                self.hits += 1
+                metrics.incr("prefetch_hits")
+        if synonyms and not is_error_result(meaning):
+            self._enqueue(synonyms.split(",")[:self.max_per_lookup])
+
+    def add_context(self, text):
+        # Neighbouring words from the copied text, e.g. the other words of a
+        # multi-word phrase or a sentence copied around an unfamiliar word.
+        with self._cond:
+            self._last_activity = time.monotonic()
+        if len(text) > self.max_context_chars:
+            return
+        words = [word for word in WORD_RE.findall(text)
+                 if len(word) >= self.min_word_length and word.lower() not in COMMON_WORDS]
+        if len(words) > 1:
+            self._enqueue(words[:self.max_per_lookup * 2])
+
+    def _enqueue(self, candidates):
+        added = False
+        with self._cond:
+            for candidate in candidates:
+                phrase = self.validate(candidate)
+                if not phrase:
+                    continue
+                key = phrase.lower()
+                if key in self._prefetched:
+                    continue
+                self._pending.pop(key, None)
+                self._pending[key] = phrase
+                added = True
+            while len(self._pending) > self.max_queue:
+                self._pending.popitem(last=False)
+            if added:
+                self._cond.notify()
+
+    def _next(self):
+        # Newest candidates first, since they belong to what is being read now.
+        with self._cond:
+            while not self._stopped:
+                idle_for = time.monotonic() - self._last_activity
+                if not self._pending:
+                    self._cond.wait()
+                elif idle_for < self.idle_delay:
+                    self._cond.wait(self.idle_delay - idle_for)
+                else:
+                    wait = self.budget.time_until_available()
+                    if wait == 0:
+                        self.budget.take()
+                        return self._pending.popitem(last=True)[1]
+                    self._cond.wait(wait)
+            return None
+
+    def _is_known(self, phrase):
+        for _, get in self.service.resolver.tiers:
+            if get(phrase):
+                return True
+        return False
+
+    def _run(self):
+        while True:
+            phrase = self._next()
+            if phrase is None:
+                return
+            try:
+                self._prefetch(phrase)
+            except Exception as e:
+                logging.warning(f"Prefetch of '{phrase}' failed: {str(e)}")
+
+    def _prefetch(self, phrase):
+        if self._is_known(phrase):
+            self.skipped += 1
+            metrics.incr("prefetch_skipped")
+            return
+
+        limiter = self.service.client.limiter
+        if limiter and not limiter.has_quota(PRIORITY_PREFETCH):
+            logging.info("Prefetch paused, the daily quota left is reserved for lookups")
+            with self._cond:
+                self._pending.clear()
+            return
+
+        with metrics.timer("prefetch"):
+            if limiter:
+                with limiter.priority(PRIORITY_PREFETCH):
+                    meaning, synonyms = self.service.fetch_one(phrase)
+            else:
+                meaning, synonyms = self.service.fetch_one(phrase)
+
+        if is_error_result(meaning):
+            self.failed += 1
+            metrics.incr("prefetch_failed")
+            return
+        self.service.store(phrase, meaning, synonyms)
+        with self._cond:
+            self._prefetched.add(phrase.lower())
+            self.prefetched += 1
+        metrics.incr("prefetched")
+        logging.debug(f"Prefetched '{phrase}'")
+
+    def hit_ratio(self):
+        return self.hits / self.prefetched if self.prefetched else 0.0
+
+    def stats(self):
+        with self._cond:
+            return {
+                "prefetched": self.prefetched,
+                "hits": self.hits,
+                "hit_ratio": round(self.hit_ratio(), 3),
+                "skipped": self.skipped,
+                "failed": self.failed,
+                "pending": len(self._pending)
+            }
@@ -0,0 +1,231 @@
+import heapq
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date
+
+from instrumentation import metrics
+
+PRIORITY_USER = 0
+PRIORITY_BATCH = 1
+PRIORITY_PREFETCH = 2
+
+class RateLimitError(Exception):
+    pass
+
+class QuotaExceededError(RateLimitError):
+    pass
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def time_until_available(self, now=None):
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+class DailyQuota:
+    # The count is written to disk once it has moved by save_every, or
+    # save_interval seconds after an unsaved request, and on exit; never
+    # while the limiter's lock is held. A crash loses at most that much.
+    def __init__(self, path, limit, save_every=10, save_interval=30.0):
+        self.path = path
+        self.limit = limit
+        self.save_every = save_every
+        self.save_interval = save_interval
+        self.day = date.today().isoformat()
+        self.used = 0
+        self._unsaved = 0
+        self._saved_at = time.monotonic()
+        self._save_lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                state = json.load(f)
+            if state.get('date') == self.day:
+                self.used = int(state.get('used', 0))
+        except Exception as e:
+            logging.warning(f"Could not read quota state: {str(e)}")
+
+    def save(self):
+        with self._save_lock:
+            day, used, unsaved = self.day, self.used, self._unsaved
+            self._saved_at = time.monotonic()
+            if not self.path or not unsaved:
+                return
+            try:
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, 'w') as f:
+                    json.dump({'date': day, 'used': used}, f)
+                os.replace(tmp_path, self.path)
+                self._unsaved -= unsaved
+            except Exception as e:
+                logging.warning(f"Could not save quota state: {str(e)}")
+
+    def save_if_due(self):
+        if self._unsaved >= self.save_every or (
+                self._unsaved and time.monotonic() - self._saved_at >= self.save_interval):
+            self.save()
+
+    def _roll_over(self):
+        today = date.today().isoformat()
+        if today != self.day:
+            self.day = today
+            self.used = 0
+
+    def remaining(self):
+        self._roll_over()
+        if not self.limit:
+            return float('inf')
+        return max(0, self.limit - self.used)
+
+    def consume(self):
+        self._roll_over()
+        self.used += 1
+        self._unsaved += 1
+
+class RateLimiter:
+    # Token bucket shared by all Gemini calls. Waiters are served strictly by
+    # priority, so a user lookup jumps ahead of queued prefetch or batch work.
+    # A 429 closes the bucket for the Retry-After period (or an exponential
+    # backoff) and halves the rate; successes slowly restore it.
+    def __init__(self, requests_per_minute=30, burst=5, daily_limit=1500, quota_path=None,
+                 background_reserve=0.2, max_wait=10.0, max_backoff=60.0):
+        self.max_rate = requests_per_minute / 60.0
+        self.bucket = TokenBucket(self.max_rate, burst)
+        self.quota = DailyQuota(quota_path, daily_limit)
+        self.background_reserve = background_reserve
+        self.max_wait = max_wait
+        self.max_backoff = max_backoff
+
+        self._cond = threading.Condition()
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._blocked_until = 0.0
+        self._backoff = 0.0
+        self._local = threading.local()
+
+    @contextmanager
+    def priority(self, priority):
+        previous = getattr(self._local, 'priority', PRIORITY_USER)
+        self._local.priority = priority
+        try:
+            yield
+        finally:
+            self._local.priority = previous
+
+    def current_priority(self):
+        return getattr(self._local, 'priority', PRIORITY_USER)
+
+    def acquire(self, priority=None, timeout=None):
+        priority = self.current_priority() if priority is None else priority
+        timeout = self.max_wait if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        start = time.monotonic()
+        entry = (priority, next(self._sequence))
+
+        with self._cond:
+            self._check_quota(priority)
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = max(self._blocked_until - now, 0.0)
+                    if self._waiters[0] == entry and wait == 0:
+                        wait = self.bucket.time_until_available(now)
+                        if wait == 0:
+                            self._check_quota(priority)
+                            self.bucket.take()
+                            self.quota.consume()
+                            metrics.observe("rate_limit_wait", now - start)
+                            break
+                    elif self._waiters[0] != entry:
+                        wait = max(wait, 0.05)
+                    if now + wait > deadline:
+                        metrics.incr("rate_limited", priority=priority)
+                        raise RateLimitError(
+                            f"Gemini is rate limiting requests, try again in {max(wait, 1):.0f}s")
+                    self._cond.wait(wait)
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+        self.quota.save_if_due()
+
+    def save(self):
+        self.quota.save()
+
+    def has_quota(self, priority=PRIORITY_USER):
+        remaining = self.quota.remaining()
+        reserve = self.quota.limit * self.background_reserve if self.quota.limit else 0
+        return remaining > 0 and (priority == PRIORITY_USER or remaining > reserve)
+
+    def _check_quota(self, priority):
+        if not self.has_quota(priority):
+            metrics.incr("quota_exhausted", priority=priority)
+            raise QuotaExceededError(
+                "Daily Gemini quota reached; only cached and offline words are available until tomorrow")
+
+    def on_throttled(self, retry_after=None):
+        with self._cond:
+            if retry_after is not None:
+                delay = retry_after
+            else:
+                self._backoff = min(self.max_backoff, max(1.0, self._backoff * 2))
+                delay = self._backoff
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+            self.bucket.rate = max(self.max_rate / 16, self.bucket.rate / 2)
+            self.bucket.tokens = min(self.bucket.tokens, 0)
+            self._cond.notify_all()
+        metrics.incr("throttled_responses")
+        logging.warning(f"Gemini returned 429, pausing requests for {delay:.1f}s")
+
+    def on_success(self):
+        with self._cond:
+            self._backoff = 0.0
+            if self.bucket.rate < self.max_rate:
+                self.bucket.rate = min(self.max_rate, self.bucket.rate + self.max_rate / 10)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "rate_per_min": self.bucket.rate * 60,
+                "quota_used": self.quota.used,
+                "quota_remaining": self.quota.remaining(),
+                "paused_for": max(0.0, self._blocked_until - time.monotonic())
+            }
+
+def parse_retry_after(value):
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        from email.utils import parsedate_to_datetime
+        from datetime import datetime, timezone
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except Exception:
+        return None
@@ -0,0 +1,71 @@
+import threading
+import time
+
+from instrumentation import metrics
+
+class TieredResolver:
+    # Tiers are tried in order and the first non-empty answer wins. Only
+    # answers from the fallback (the network) are handed to `store`, since
+    # the earlier tiers are local already.
+    def __init__(self, tiers, fallback, store=None):
+        self.tiers = list(tiers)
+        self.fallback = fallback
+        self.store = store
+        self._lock = threading.Lock()
+        self.hits = {name: 0 for name, _ in self.tiers}
+        self.hits["remote"] = 0
+
+    def resolve(self, phrase, progress=None):
+        result = self.resolve_local(phrase)
+        if result:
+            return result
+
+        with metrics.timer("tier_lookup", tier="remote"):
+            if progress:
+                meaning, synonyms = self.fallback(phrase, progress)
+            else:
+                meaning, synonyms = self.fallback(phrase)
+        self._remote(phrase, meaning, synonyms)
+        return meaning, synonyms
+
+    def resolve_local(self, phrase, tiers=None):
+        for name, get in self.tiers if tiers is None else tiers:
+            start = time.perf_counter()
+            result = get(phrase)
+            metrics.observe("tier_lookup", time.perf_counter() - start, tier=name)
+            if result:
+                self._count(name)
+                metrics.incr("tier_hits", tier=name)
+                return result
+            metrics.incr("tier_misses", tier=name)
+        return None
+
+    def resolve_many(self, phrases, fallback_many, tiers=None):
+        # Every phrase the tiers cannot answer goes to `fallback_many` in a
+        # single call, which returns {phrase: (meaning, synonyms)}.
+        results = {}
+        missing = []
+        for phrase in phrases:
+            result = self.resolve_local(phrase, tiers)
+            if result:
+                results[phrase] = result
+            else:
+                missing.append(phrase)
+        if missing:
+            with metrics.timer("tier_lookup", tier="remote"):
+                fetched = fallback_many(missing)
+            for phrase in missing:
+                meaning, synonyms = fetched[phrase]
+                self._remote(phrase, meaning, synonyms)
+                results[phrase] = meaning, synonyms
+        return results
+
+    def _remote(self, phrase, meaning, synonyms):
+        self._count("remote")
+        metrics.incr("tier_hits", tier="remote")
+        if self.store:
+            self.store(phrase, meaning, synonyms)
+
+    def _count(self, name):
+        with self._lock:
+            self.hits[name] = self.hits.get(name, 0) + 1
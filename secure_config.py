@@ -0,0 +1,143 @@
+import json
+import logging
+import os
+import threading
+
+# Owns everything under the app data directory that holds the API key. The
+# directory is resolved and created once, the Fernet cipher is built once, and
+# the decrypted key is kept for the life of the process. config.json is only
+# read again when its mtime or size changes, so asking for the key is a stat()
+# and a tuple compare. A changed key is handed to the on_change callbacks.
+
+class SecureConfig:
+    def __init__(self, app_dir):
+        os.makedirs(app_dir, exist_ok=True)
+        self.app_dir = app_dir
+        self.config_file = os.path.join(app_dir, 'config.json')
+        self.key_file = os.path.join(app_dir, '.key')
+        self.reloads = 0
+        self._lock = threading.RLock()
+        self._cipher = None
+        # (config.json stamp, decrypted key), replaced as one tuple so the
+        # unlocked fast path never pairs a new stamp with an old key.
+        self._state = (None, None)
+        self._callbacks = []
+        self._watcher = None
+        self._stop = threading.Event()
+
+    def path(self, name):
+        return os.path.join(self.app_dir, name)
+
+    def cipher(self):
+        with self._lock:
+            if self._cipher is None:
+                from cryptography.fernet import Fernet
+                self._cipher = Fernet(self._load_secret(Fernet))
+            return self._cipher
+
+    def _load_secret(self, Fernet):
+        if os.path.exists(self.key_file):
+            with open(self.key_file, 'rb') as f:
+                return f.read()
+        key = Fernet.generate_key()
+        with open(self.key_file, 'wb') as f:
+            f.write(key)
+        return key
+
+    def encrypt(self, value):
+        return self.cipher().encrypt(value.encode()).decode()
+
+    def decrypt(self, token):
+        try:
+            return self.cipher().decrypt(token.encode()).decode()
+        except Exception:
+            return None
+
+    def _config_stamp(self):
+        try:
+            st = os.stat(self.config_file)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _read_config(self):
+        try:
+            with open(self.config_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def has_api_key(self):
+        # Answered without decrypting, so the first-run check does not have to
+        # import cryptography.
+        if self._state[1] is not None:
+            return True
+        return bool(self._read_config().get('api_key'))
+
+    def api_key(self):
+        stamp, api_key = self._state
+        if self._config_stamp() == stamp:
+            return api_key
+        return self.reload()
+
+    def reload(self):
+        with self._lock:
+            stamp = self._config_stamp()
+            previous_stamp, previous = self._state
+            if stamp == previous_stamp:
+                return previous
+            encrypted_key = self._read_config().get('api_key') if stamp else None
+            api_key = self.decrypt(encrypted_key) if encrypted_key else None
+            if encrypted_key and api_key is None:
+                logging.warning("Stored API key could not be decrypted")
+            self._state = (stamp, api_key)
+            self.reloads += 1
+        if api_key and api_key != previous:
+            self._notify(api_key)
+        return api_key
+
+    def save_api_key(self, api_key):
+        # Written to a temporary file and renamed, so a watcher in this or
+        # another process never reads a half-written config.
+        encrypted_key = self.encrypt(api_key)
+        with self._lock:
+            config = self._read_config()
+            config['api_key'] = encrypted_key
+            tmp_file = self.config_file + '.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump(config, f)
+            os.replace(tmp_file, self.config_file)
+            previous = self._state[1]
+            self._state = (self._config_stamp(), api_key)
+        if api_key != previous:
+            self._notify(api_key)
+
+    def on_change(self, callback):
+        self._callbacks.append(callback)
+
+    def _notify(self, api_key):
+        for callback in list(self._callbacks):
+            try:
+                callback(api_key)
+            except Exception as e:
+                logging.error(f"API key change handler failed: {str(e)}")
+
+    def watch(self, interval=2.0):
+        # Picks up a key saved by another instance, or config.json replaced by
+        # hand, without a restart.
+        if self._watcher is not None:
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, args=(interval,), name="config-watch", daemon=True)
+        self._watcher.start()
+
+    def _watch(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.api_key()
+            except Exception as e:
+                logging.error(f"Error checking config file: {str(e)}")
+
+    def stop(self):
+        self._stop.set()
+        self._watcher = None
@@ -0,0 +1,46 @@
+import threading
+from concurrent.futures import Future
+
+class SingleFlight:
+    # Concurrent calls for the same key share the first caller's result
+    # instead of starting their own call.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self.issued = 0
+        self.coalesced = 0
+
+    def do(self, key, func, *args, **kwargs):
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                future = Future()
+                self._in_flight[key] = future
+                self.issued += 1
+                leader = True
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._in_flight)
+
+    def stats(self):
+        with self._lock:
+            return {"issued": self.issued, "coalesced": self.coalesced}
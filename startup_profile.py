@@ -0,0 +1,40 @@
+import threading
+import time
+from contextlib import contextmanager
+
+class StartupProfile:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self._last_mark = self.started
+        self._phases = []
+        self._lock = threading.Lock()
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self._record(name, self._last_mark, now)
+        self._last_mark = now
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, start, time.perf_counter())
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def _record(self, name, start, end):
+        with self._lock:
+            self._phases.append((start - self.started, end - start, threading.current_thread().name, name))
+
+    def report(self):
+        with self._lock:
+            phases = sorted(self._phases)
+        lines = [f"{'start ms':>9} {'took ms':>9}  {'thread':<14} phase"]
+        for start, duration, thread, name in phases:
+            lines.append(f"{start * 1000:9.1f} {duration * 1000:9.1f}  {thread[:14]:<14} {name}")
+        lines.append(f"total: {self.elapsed() * 1000:.1f} ms")
+        return "\n".join(lines)